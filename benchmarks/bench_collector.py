@@ -0,0 +1,93 @@
+"""
+bench_collector.py
+
+Crawl a local stub HTTP server with the async collector and with the
+sequential `scrape_web_page`, and compare pages/sec. The stub adds a
+fixed latency per request and fails the first hit on every tenth page
+with a 503, so retries are exercised as well.
+
+Usage:
+    python benchmarks/bench_collector.py [--pages 300] [--latency 0.05]
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from data_collection import scrape_web_page
+from async_collection import stream_collected
+
+PAGE = ("<html><body><h1>Edo decides</h1>"
+        "<p>Voters for Oredo don line up since morning.</p>"
+        "<p>Results from ward {n} are being collated.</p></body></html>")
+
+
+def make_handler(latency):
+    seen = set()
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            n = self.path.rsplit("/", 1)[-1]
+            with lock:
+                first_hit = self.path not in seen
+                seen.add(self.path)
+            if first_hit and n.isdigit() and int(n) % 10 == 0:
+                self.send_response(503)
+                self.end_headers()
+                return
+            body = PAGE.format(n=n).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the async collector against a stub server")
+    parser.add_argument('--pages', type=int, default=300, help="Number of pages to crawl")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds of server latency per request")
+    parser.add_argument('--concurrency', type=int, default=50, help="Async requests in flight")
+    parser.add_argument('--sequential-sample', type=int, default=30,
+                        help="Pages crawled with scrape_web_page (extrapolated)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/page"
+
+    urls = [f"{base}/{i}" for i in range(1, args.pages + 1)]
+    start = time.perf_counter()
+    items = list(stream_collected(urls=urls, concurrency=args.concurrency,
+                                  per_host=args.concurrency, backoff=0.05))
+    async_time = time.perf_counter() - start
+    failed = sum(1 for item in items if item["error"])
+
+    # pages not divisible by 10, so the sequential scraper never sees a 503
+    sample = [f"{base}/s{i}" for i in range(args.sequential_sample)]
+    start = time.perf_counter()
+    for url in sample:
+        scrape_web_page(url)
+    seq_per_page = (time.perf_counter() - start) / len(sample)
+    server.shutdown()
+
+    print(f"pages               : {len(items)} ({failed} failed)")
+    print(f"async collector     : {async_time:.2f}s  ({len(items) / async_time:,.0f} pages/sec)")
+    print(f"scrape_web_page     : ~{seq_per_page * args.pages:.2f}s  ({1 / seq_per_page:,.0f} pages/sec)")
+    print(f"speedup             : {seq_per_page * args.pages / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+bench_fusion_memory.py
+
+Peak memory (tracemalloc) and time of the fusion step on synthetic
+features shaped like the real ones: a sparse TF-IDF matrix, 13 MFCC
+means and 50 image PCA components per row. Compares the original
+dense `toarray()` + `np.hstack` fusion with the sparse early-fusion and
+the late-fusion paths of `MultimodalFusion`.
+
+Usage:
+    python benchmarks/bench_fusion_memory.py [--rows 20000] [--vocab 5000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from models.multimodal_fusion import MultimodalFusion
+
+
+def dense_fusion(txt, aud, img, labels):
+    """The pre-optimisation fusion, kept verbatim for comparison."""
+    X = np.hstack([txt.toarray() if hasattr(txt, "toarray") else txt, aud, img])
+    clf = LogisticRegression(max_iter=1000).fit(X, labels)
+    X = np.hstack([txt.toarray() if hasattr(txt, "toarray") else txt, aud, img])
+    return clf.predict(X)
+
+
+def sparse_fusion(fusion):
+    def run(txt, aud, img, labels):
+        return MultimodalFusion(fusion=fusion).fit(txt, aud, img, labels).predict(txt, aud, img)
+    return run
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory use of the fusion strategies")
+    parser.add_argument('--rows', type=int, default=20000, help="Number of samples")
+    parser.add_argument('--vocab', type=int, default=5000, help="TF-IDF columns")
+    parser.add_argument('--density', type=float, default=0.003, help="Non-zero fraction of TF-IDF")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    txt = sparse.random(args.rows, args.vocab, density=args.density, format="csr",
+                        random_state=0, dtype=np.float64)
+    aud = rng.normal(size=(args.rows, 13))
+    img = rng.normal(size=(args.rows, 50))
+    labels = rng.choice(["Positive", "Neutral", "Negative"], size=args.rows)
+
+    print(f"rows={args.rows}  tfidf={args.vocab} cols ({txt.nnz:,} non-zeros)")
+    for name, func in [("dense hstack (old)", dense_fusion),
+                       ("sparse early fusion", sparse_fusion("early")),
+                       ("late fusion", sparse_fusion("late"))]:
+        peak, elapsed = measure(func, txt, aud, img, labels)
+        print(f"{name:<22}: peak {peak / 2**20:8.1f} MiB   {elapsed:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+bench_lexicon.py
+
+Score cleaned texts with the compiled lexicon (`polarity_scores_batch`)
+and with NLTK VADER's rule walk on the same phrase-merged texts: checks
+the scores are identical and reports texts/sec for both, plus the share
+of texts handled by the compiled fast path.
+
+Usage:
+    python benchmarks/bench_lexicon.py [--repeat 200] [--batch-size 1000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from bench_normalizer import build_corpus
+from data_preprocessing import clean_text_for_vader
+from sentiment_analysis import compiled_lexicon, get_analyzer, polarity_scores_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled lexicon scorer")
+    parser.add_argument('--repeat', type=int, default=200, help="Copies of the labelled corpus")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Texts per compiled batch call")
+    args = parser.parse_args()
+
+    cleaned = [clean_text_for_vader(t) for t in build_corpus(args.repeat)]
+    # multi-word Pidgin entries, so the phrase trie is exercised
+    cleaned += ["gbas gbos everywhere", "result e choke well", "kata kata polling unit",
+                "voter shine eye", "supporter pepper dem"] * args.repeat
+    analyzer = get_analyzer()  # build NLTK VADER outside the timed region
+
+    start = time.perf_counter()
+    ref = [analyzer.polarity_scores(compiled_lexicon.merge_phrases(t)) for t in cleaned]
+    ref_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = []
+    for i in range(0, len(cleaned), args.batch_size):
+        new.extend(polarity_scores_batch(cleaned[i:i + args.batch_size]))
+    new_time = time.perf_counter() - start
+
+    fast = sum(r is not None for r in compiled_lexicon.polarity_scores_batch(cleaned))
+    mismatches = sum(a != b for a, b in zip(ref, new))
+    print(f"texts      : {len(cleaned)}  ({len(compiled_lexicon)} lexicon entries)")
+    print(f"fast path  : {fast / len(cleaned):.1%} of texts")
+    print(f"vader      : {len(cleaned) / ref_time:,.0f} texts/sec")
+    print(f"compiled   : {len(cleaned) / new_time:,.0f} texts/sec")
+    print(f"speedup    : {ref_time / new_time:.1f}x")
+    print(f"mismatches : {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+bench_normalizer.py
+
+Compare `clean_text_for_vader` against the original per-call
+regex + lemmatize implementation: checks the outputs are identical and
+reports texts/sec for both.
+
+Usage:
+    python benchmarks/bench_normalizer.py [--repeat 200]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import data_preprocessing
+from data_preprocessing import clean_text_for_vader, stop_words, lemmatizer
+
+LABELS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "text_labels.csv")
+
+
+def reference_clean(text):
+    """The pre-optimisation implementation, kept verbatim for comparison."""
+    text = text.lower()
+    text = re.sub(r"http\S+|@\S+|#\S+", "", text)
+    text = re.sub(r"[^a-z\s]", "", text)
+    tokens = [
+        lemmatizer.lemmatize(word)
+        for word in text.split()
+        if word not in stop_words
+    ]
+    return " ".join(tokens)
+
+
+def build_corpus(repeat):
+    texts = pd.read_csv(LABELS_CSV)['text'].tolist()
+    extras = [
+        "RT @inecnigeria: Results don land for Oredo!!! https://t.co/abc #EdoDecides2024",
+        "Wahala dey o, the agents no gree commot from the polling unit 😡",
+        "Naija go better; the Governorship candidates debated policies peacefully.",
+    ]
+    corpus = []
+    for i in range(repeat):
+        for t in texts + extras:
+            corpus.append(f"{t} #{i}" if i % 2 else t)
+    return corpus
+
+
+def time_it(fn, corpus):
+    start = time.perf_counter()
+    out = [fn(t) for t in corpus]
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clean_text_for_vader")
+    parser.add_argument('--repeat', type=int, default=200, help="Copies of the labelled corpus")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.repeat)
+    lemmatizer.lemmatize("warmup")  # load WordNet outside the timed region
+
+    ref_out, ref_time = time_it(reference_clean, corpus)
+    data_preprocessing._lemma_cache.clear()
+    new_out, new_time = time_it(clean_text_for_vader, corpus)
+
+    mismatches = sum(a != b for a, b in zip(ref_out, new_out))
+    print(f"texts      : {len(corpus)}")
+    print(f"reference  : {len(corpus) / ref_time:,.0f} texts/sec")
+    print(f"optimised  : {len(corpus) / new_time:,.0f} texts/sec")
+    print(f"speedup    : {ref_time / new_time:.1f}x")
+    print(f"mismatches : {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+bench_startup.py
+
+Measure how long the text-only CLI takes to import, in fresh interpreters,
+and check that none of the multimodal stack is loaded on that path.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+HEAVY_MODULES = ["torch", "transformers", "librosa", "cv2", "sklearn", "scipy", "nltk", "matplotlib", "tweepy"]
+
+PROBE = f"""
+import sys, json, time
+sys.path.insert(0, {SRC_DIR!r})
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_s": elapsed,
+                  "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def run_once():
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["wall_s"] = wall
+    return result
+
+
+def slowest_imports(top=10):
+    """Top cumulative entries from `python -X importtime`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {SRC_DIR!r}); import main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = [p.strip() for p in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text-only CLI startup")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    print(f"import main   : median {statistics.median(r['import_s'] for r in results):.3f}s")
+    print(f"process wall  : median {statistics.median(r['wall_s'] for r in results):.3f}s")
+    print(f"heavy modules : {results[-1]['heavy'] or 'none'}")
+    print("\nslowest imports (cumulative):")
+    for cumulative_us, name in slowest_imports():
+        print(f"  {cumulative_us / 1e6:7.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
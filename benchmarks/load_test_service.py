@@ -0,0 +1,132 @@
+"""
+load_test_service.py
+
+Drive the scoring service (src/service.py) with concurrent keep-alive
+clients sending synthetic Edo-election posts, and report client-side
+throughput and p50/p95/p99 latency next to the server's own /stats
+(request latency, micro-batch sizes).
+
+By default the service is started in this process on a free port;
+`--url` targets one that is already running (`main.py serve`).
+
+Usage:
+    python benchmarks/load_test_service.py [--clients 32] [--requests 200]
+    python benchmarks/load_test_service.py --max-batch 1        # no batching, for comparison
+    python benchmarks/load_test_service.py --endpoint score_batch --batch-size 50
+    python benchmarks/load_test_service.py --url http://127.0.0.1:8000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+from instrumentation import Metrics
+from synthetic import TextGenerator
+
+
+def run_client(host, port, endpoint, texts, batch_size, n_requests, offset, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    headers = {"Content-Type": "application/json"}
+    for i in range(n_requests):
+        k = (offset + i) * batch_size
+        if endpoint == "score":
+            body, items = {"text": texts[k % len(texts)]}, 1
+        else:
+            body = {"texts": [texts[(k + j) % len(texts)] for j in range(batch_size)]}
+            items = batch_size
+        start = time.perf_counter()
+        try:
+            # bytes, so http.client sends headers and body in one packet
+            conn.request("POST", f"/{endpoint}", json.dumps(body).encode("utf-8"), headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            ok = False
+        if ok:
+            latencies.add_time(endpoint, time.perf_counter() - start, items)
+        else:
+            errors.count("errors")
+    conn.close()
+
+
+def get_stats(host, port):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the HTTP scoring service")
+    parser.add_argument('--url', help="Running service to target (default: start one in-process)")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent connections")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per client")
+    parser.add_argument('--endpoint', choices=['score', 'score_batch'], default='score')
+    parser.add_argument('--batch-size', type=int, default=20, help="Texts per /score_batch request")
+    parser.add_argument('--texts', type=int, default=5000, help="Distinct synthetic texts")
+    parser.add_argument('--max-batch', type=int, default=64, help="In-process service: micro-batch size")
+    parser.add_argument('--max-wait-ms', type=float, default=0.0, help="In-process service: batch wait")
+    args = parser.parse_args()
+
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        from service import make_server
+        server = make_server("127.0.0.1", 0, args.max_batch, args.max_wait_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.server_port
+
+    texts = TextGenerator(seed=1).texts(args.texts)
+    batch_size = 1 if args.endpoint == "score" else args.batch_size
+    latencies, errors = Metrics(), Metrics()
+    latencies.enable()
+    errors.enable()
+
+    clients = [threading.Thread(target=run_client,
+                                args=(host, port, args.endpoint, texts, batch_size,
+                                      args.requests, c * args.requests, latencies, errors))
+               for c in range(args.clients)]
+    start = time.perf_counter()
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    wall = time.perf_counter() - start
+
+    client = latencies.report()["stages"].get(args.endpoint)
+    n_errors = errors.report()["counters"].get("errors", 0)
+    print(f"endpoint   : /{args.endpoint} ({args.clients} clients x {args.requests} requests, "
+          f"{batch_size} text(s) each)")
+    if client:
+        print(f"throughput : {client['count'] / wall:,.0f} req/s, {client['items'] / wall:,.0f} texts/s")
+        print(f"latency    : p50 {client['p50_ms']:.2f} ms, p95 {client['p95_ms']:.2f} ms, "
+              f"p99 {client['p99_ms']:.2f} ms, max {client['max_ms']:.2f} ms (client side)")
+    print(f"errors     : {n_errors}")
+
+    stats = get_stats(host, port)
+    server_side = stats["requests"].get(f"http_{args.endpoint}")
+    if server_side:
+        print(f"server     : p50 {server_side['p50_ms']:.2f} ms, p99 {server_side['p99_ms']:.2f} ms")
+    batches = stats["batches"].get("service_batch_texts")
+    if batches:
+        print(f"batches    : {batches['count']:,} scorer calls, {batches['mean']:.1f} texts "
+              f"on average (max {batches['max']})")
+    if stats.get("score_cache"):
+        print(f"score cache: {stats['score_cache']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+run_benchmarks.py
+
+Benchmark harness for the hot paths. Every stage runs in a fresh
+interpreter so its peak RSS is its own; timings are recorded with
+`instrumentation.metrics` (throughput, p50/p95/max latency). Results are
+saved as JSON and can be compared against a baseline run.
+
+Stages:
+    clean          clean_text_for_vader, one text per call
+    analyze        analyze_and_classify, one text per call (cold score cache, distinct texts)
+    analyze_batch  analyze_and_classify_batch, 1000 texts per call (cold, distinct texts)
+    insert         insert_sentiment_data, one row per call (fresh DB)
+    writer         SentimentWriter, batched (fresh DB)
+    queries        dashboard queries against the synthetic bench.db
+    audio          preprocess_audio, one WAV per call
+    image          preprocess_image, one image per call
+
+Usage:
+    python benchmarks/synthetic.py --out data/bench --rows 2000000
+    python benchmarks/run_benchmarks.py --data data/bench --output base.json
+    python benchmarks/run_benchmarks.py --data data/bench --baseline base.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+import datetime
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+STAGES = ["clean", "analyze", "analyze_batch", "insert", "writer", "queries", "audio", "image"]
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+# ── memory ───────────────────────────────────────────────────────────────────
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux); no-op elsewhere."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    peak = _proc_status_mb("VmHWM")
+    if peak is None:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        if sys.platform == "darwin":
+            peak /= 1024  # bytes there
+    return peak
+
+
+# ── stage workloads (run in the child) ───────────────────────────────────────
+def load_texts(data_dir, n):
+    path = os.path.join(data_dir, "texts.txt")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            texts = f.read().split("\n")
+    else:
+        from synthetic import TextGenerator
+        texts = TextGenerator().texts(n)
+    while len(texts) < n:
+        texts = texts + texts
+    return texts[:n]
+
+
+def stage_clean(data_dir, n, metrics):
+    import data_preprocessing
+    texts = load_texts(data_dir, n)
+    data_preprocessing._lemma_cache.clear()
+    data_preprocessing.lemmatize_token("warmup")  # load WordNet outside the timed region
+    yield
+    for text in texts:
+        with metrics.stage("clean_text_for_vader"):
+            data_preprocessing.clean_text_for_vader(text)
+
+
+def _letter_tag(i):
+    # 0 -> "zqa", 25 -> "zqz", 26 -> "zqba", ...: alphabetic, no stopword and
+    # unknown to WordNet, so it survives clean_text_for_vader unchanged
+    letters = ""
+    while True:
+        i, r = divmod(i, 26)
+        letters = chr(ord("a") + r) + letters
+        if not i:
+            return "zq" + letters
+
+
+def distinct_texts(data_dir, n):
+    # load_texts repeats its input to reach `n`; tagging each copy with its
+    # own word keeps every text distinct both raw and cleaned, so neither the
+    # score cache nor the batch scorer's cleaned-text dedup can skip work
+    return [f"{text} {_letter_tag(i)}" for i, text in enumerate(load_texts(data_dir, n))]
+
+
+def record_cache_hits(metrics, score_cache, before):
+    after = score_cache.stats()
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    metrics.gauge("score_cache", {"hits": hits, "misses": misses,
+                                  "hit_rate": hits / (hits + misses) if hits + misses else 0.0})
+
+
+def stage_analyze(data_dir, n, metrics):
+    from sentiment_analysis import analyze_and_classify, score_cache
+    texts = distinct_texts(data_dir, n)
+    score_cache.clear()
+    before = score_cache.stats()
+    yield
+    for text in texts:
+        with metrics.stage("analyze_and_classify"):
+            analyze_and_classify(text)
+    record_cache_hits(metrics, score_cache, before)
+
+
+def stage_analyze_batch(data_dir, n, metrics, batch_size=1000):
+    from sentiment_analysis import analyze_and_classify_batch, score_cache
+    texts = distinct_texts(data_dir, n)
+    score_cache.clear()
+    before = score_cache.stats()
+    yield
+    for i in range(0, len(texts), batch_size):
+        batch = texts[i:i + batch_size]
+        with metrics.stage("analyze_and_classify_batch", items=len(batch)):
+            analyze_and_classify_batch(batch)
+    record_cache_hits(metrics, score_cache, before)
+
+
+def _fresh_db():
+    from database import initialize_db
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "bench.db")
+    initialize_db(path)
+    return path
+
+
+def stage_insert(data_dir, n, metrics):
+    from database import insert_sentiment_data
+    texts = load_texts(data_dir, min(n, 5000))
+    path = _fresh_db()
+    yield
+    for i, text in enumerate(texts):
+        with metrics.stage("insert_sentiment_data"):
+            insert_sentiment_data("twitter", f"{text} {i}", "Neutral", 0.0, db_path=path)
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def stage_writer(data_dir, n, metrics):
+    from database import SentimentWriter
+    texts = load_texts(data_dir, n)
+    path = _fresh_db()
+    yield
+    with metrics.stage("SentimentWriter", items=len(texts)):
+        with SentimentWriter(path, batch_size=500) as writer:
+            for i, text in enumerate(texts):
+                writer.add("twitter", f"{text} {i}", "Neutral", 0.0)
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def stage_queries(data_dir, n, metrics, repeat=20):
+    import sqlite3
+    import queries
+    path = os.path.join(data_dir, "bench.db")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} missing; run benchmarks/synthetic.py first")
+    conn = sqlite3.connect(path)
+    first, last = queries.date_bounds(conn)
+    week = (last - datetime.timedelta(days=7), last) if last else (None, None)
+    sources = queries.list_sources(conn)[:1]
+    deep_page = queries.latest_id(conn) - 1000  # keyset cursor ~20 pages down
+    calls = {
+        "label_counts": lambda: queries.label_counts(conn),
+        "daily_counts": lambda: queries.daily_counts(conn),
+        "daily_counts_source": lambda: queries.daily_counts(conn, sources=sources),
+        "source_counts_week": lambda: queries.source_counts(conn, *week),
+        "fetch_rows_page": lambda: queries.fetch_rows(conn, limit=50, before_id=deep_page),
+        "fetch_new_rows": lambda: queries.fetch_new_rows(conn, queries.latest_id(conn) - 50),
+        "top_tokens": lambda: queries.top_tokens(conn),
+        "top_tokens_week": lambda: queries.top_tokens(conn, 200, *week),
+    }
+    yield
+    for _ in range(repeat):
+        for name, call in calls.items():
+            with metrics.stage(name):
+                call()
+    conn.close()
+
+
+def _media_paths(data_dir, column, n):
+    import csv
+    path = os.path.join(data_dir, "dataset.csv")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} missing; run benchmarks/synthetic.py --media N first")
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row[column] for row in csv.DictReader(f)][:n]
+
+
+def stage_audio(data_dir, n, metrics):
+    from data_preprocessing import preprocess_audio
+    paths = _media_paths(data_dir, "audio_path", n)
+    preprocess_audio(paths[:1])  # import librosa outside the timed region
+    yield
+    for path in paths:
+        with metrics.stage("preprocess_audio"):
+            preprocess_audio([path])
+
+
+def stage_image(data_dir, n, metrics):
+    from data_preprocessing import preprocess_image
+    paths = _media_paths(data_dir, "image_path", n)
+    preprocess_image(paths[:1])
+    yield
+    for path in paths:
+        with metrics.stage("preprocess_image"):
+            preprocess_image([path])
+
+
+def run_child(stage, data_dir, n):
+    """Run one stage in this process and print its JSON result."""
+    from instrumentation import metrics
+
+    workload = globals()[f"stage_{stage}"](data_dir, n, metrics)
+    next(workload)  # setup: imports, data loading
+    setup_rss = peak_rss_mb()
+    reset_peak_rss()
+    metrics.enable()
+    start = time.perf_counter()
+    for _ in workload:
+        pass
+    wall = time.perf_counter() - start
+    report = metrics.report()
+    result = {"stages": report["stages"], "wall_s": round(wall, 4),
+              "setup_rss_mb": round(setup_rss, 1), "peak_rss_mb": round(peak_rss_mb(), 1)}
+    if report["gauges"]:
+        result["gauges"] = report["gauges"]
+    print(json.dumps(result))
+
+
+# ── parent: run, save, compare ───────────────────────────────────────────────
+def run_stage(stage, data_dir, n):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", stage,
+                          "--data", data_dir, "-n", str(n)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regressions of `results` against `baseline`: throughput down, or p95
+    latency / peak RSS up, by more than `tolerance` (a fraction).
+
+    Returns:
+        list: (stage, metric, baseline value, new value) tuples.
+    """
+    regressions = []
+    for stage, new in results["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old or "error" in new or "error" in old:
+            continue
+        if old["peak_rss_mb"] and new["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            regressions.append((stage, "peak_rss_mb", old["peak_rss_mb"], new["peak_rss_mb"]))
+        for name, stats in new["stages"].items():
+            before = old["stages"].get(name)
+            if not before:
+                continue
+            if before["items_per_s"] and stats["items_per_s"] < before["items_per_s"] * (1 - tolerance):
+                regressions.append((f"{stage}/{name}", "items_per_s", before["items_per_s"], stats["items_per_s"]))
+            if before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append((f"{stage}/{name}", "p95_ms", before["p95_ms"], stats["p95_ms"]))
+    return regressions
+
+
+def print_results(results):
+    print(f"{'stage':<34}{'items/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'peak MB':>10}")
+    for stage, res in results["stages"].items():
+        if "error" in res:
+            print(f"{stage:<34}  skipped: {res['error']}")
+            continue
+        for name, stats in res["stages"].items():
+            label = stage if name == stage else f"{stage}/{name}"
+            print(f"{label:<34}{stats['items_per_s'] or 0:>12,.0f}{stats['p50_ms']:>10.3f}"
+                  f"{stats['p95_ms']:>10.3f}{res['peak_rss_mb']:>10.1f}")
+        cache = res.get("gauges", {}).get("score_cache")
+        if cache:
+            print(f"{'':<34}  score cache hit rate {cache['hit_rate']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--data', default=os.path.join(ROOT_DIR, "data", "bench"),
+                        help="Directory written by benchmarks/synthetic.py")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('-n', type=int, default=20_000, help="Items per stage (texts, rows, files)")
+    parser.add_argument('--output', help="Result JSON (default: benchmarks/results/<time>.json)")
+    parser.add_argument('--baseline', help="Earlier result JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Allowed relative slowdown / memory growth before flagging")
+    parser.add_argument('--child', choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.data, args.n)
+        return
+
+    results = {
+        "meta": {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+                 "commit": git_commit(), "python": platform.python_version(),
+                 "platform": platform.platform(), "n": args.n, "data": os.path.abspath(args.data)},
+        "stages": {},
+    }
+    for stage in args.stages:
+        print(f"running {stage} ...", file=sys.stderr)
+        results["stages"][stage] = run_stage(stage, args.data, args.n)
+    print_results(results)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults    : {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"baseline   : {args.baseline} ({baseline['meta'].get('commit')})")
+        for stage, metric, old, new in regressions:
+            print(f"REGRESSION : {stage} {metric} {old} -> {new}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
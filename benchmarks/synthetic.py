@@ -0,0 +1,223 @@
+"""
+synthetic.py
+
+Synthetic Edo-election data for the benchmarks:
+
+- Pidgin/English tweets and news headlines built from templates
+  (candidates, LGAs, Pidgin lexicon entries, URLs, mentions, hashtags)
+- a `sentiment_data` SQLite database of any size (millions of rows),
+  spread over days and sources, with rollups, token index and dedup keys
+- small dummy WAV files and images plus a multimodal dataset CSV
+
+Everything is seeded, so the same arguments always produce the same data.
+
+Usage:
+    python benchmarks/synthetic.py --out data/bench --rows 2000000 --media 200
+"""
+
+import os
+import sys
+import wave
+import random
+import argparse
+import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lexicon import load_pidgin_lexicon, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+
+CANDIDATES = ["Okpebholo", "Ighodalo", "Akpata", "Obaseki", "Shaibu", "Oshiomhole"]
+PARTIES = ["APC", "PDP", "LP", "INEC"]
+PLACES = ["Oredo", "Egor", "Ikpoba-Okha", "Esan West", "Etsako West", "Owan East",
+          "Akoko-Edo", "Uhunmwonde", "Ovia North-East", "Benin City", "Auchi", "Ekpoma"]
+POSITIVE = ["peaceful", "credible", "great", "proud", "transparent", "happy", "orderly", "fair"]
+NEGATIVE = ["rigged", "violent", "bad", "angry", "chaotic", "fraud", "delayed", "snatched"]
+NEUTRAL = ["voting", "collation", "results", "accreditation", "turnout", "agents", "officials"]
+SOURCES = ["twitter", "news", "web"]
+
+TWEET_TEMPLATES = [
+    "{pidgin} o! {cand} supporters for {place} {sent} today PU {unit} #EdoDecides2024",
+    "@{handle} the {neutral} for {place} {sent}, {pidgin} {pidgin2} {url}",
+    "{cand} don win {place}? {pidgin}, e be like say na {sent} election #EdoElection",
+    "RT @{handle}: {party} agents for ward {unit} {sent} {url}",
+    "Abeg make una calm down, {neutral} for {place} still dey go on. {pidgin}!",
+    "{place} people, {pidgin2} {pidgin}. This {neutral} is {sent} {url}",
+]
+HEADLINE_TEMPLATES = [
+    "{party} alleges {sent} {neutral} in {place} as {cand} leads ward {unit}",
+    "Edo poll: {cand} commends {sent} {neutral} in {place}",
+    "{party}, {party2} trade words over {sent} {neutral} in {place} LGA {unit}",
+    "Tribunal: {cand} calls {place} {neutral} {sent}",
+]
+
+
+class TextGenerator:
+    """Seeded generator of synthetic tweets and headlines."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.pidgin = list(load_pidgin_lexicon())
+
+    def _fill(self, template):
+        r = self.rng
+        sentiment = r.random()
+        pool = POSITIVE if sentiment < 0.4 else NEGATIVE if sentiment < 0.75 else NEUTRAL
+        parties = r.sample(PARTIES, 2)
+        return template.format(
+            cand=r.choice(CANDIDATES), place=r.choice(PLACES), sent=r.choice(pool),
+            neutral=r.choice(NEUTRAL), pidgin=r.choice(self.pidgin), pidgin2=r.choice(self.pidgin),
+            party=parties[0], party2=parties[1], unit=f"{r.randrange(1, 40):03d}/{r.randrange(1, 999):03d}",
+            handle=f"edo_voter{r.randrange(100_000)}", url=f"https://t.co/{r.getrandbits(40):x}",
+        )
+
+    def tweet(self):
+        return self._fill(self.rng.choice(TWEET_TEMPLATES))
+
+    def headline(self):
+        return self._fill(self.rng.choice(HEADLINE_TEMPLATES))
+
+    def texts(self, n, kind="mixed"):
+        """`n` texts: 'tweet', 'headline' or 'mixed' (3 tweets : 1 headline)."""
+        out = []
+        for i in range(n):
+            if kind == "tweet" or (kind == "mixed" and i % 4):
+                out.append(self.tweet())
+            else:
+                out.append(self.headline())
+        return out
+
+
+def build_database(path, rows, days=90, chunk_size=50_000, seed=0, token_index=True, lsh_index=False):
+    """
+    Create (or extend) a `sentiment_data` database with `rows` synthetic rows.
+
+    Rows go in through plain executemany in large transactions (the
+    rollup triggers still fire). The token-frequency index is rebuilt
+    afterwards in one pass, and the MinHash/LSH dedup index only on
+    request because it is the slowest part.
+
+    Returns:
+        int: Rows actually stored (exact duplicates are skipped).
+    """
+    from database import initialize_db, get_connection, content_hash, rebuild_token_index
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    initialize_db(path)
+    conn = get_connection(path)
+    gen = TextGenerator(seed)
+    rng = np.random.default_rng(seed)
+    start_day = datetime.datetime(2024, 9, 21) - datetime.timedelta(days=days)
+    before = conn.execute("SELECT COUNT(*) FROM sentiment_data").fetchone()[0]
+    sql = '''
+        INSERT OR IGNORE INTO sentiment_data
+            (source, content, sentiment_label, sentiment_score, content_hash, date_collected)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    done = 0
+    while done < rows:
+        n = min(chunk_size, rows - done)
+        texts = gen.texts(n)
+        scores = np.round(np.clip(rng.normal(0, 0.45, n), -1, 1), 4)
+        labels = np.select([scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+                           ["Positive", "Negative"], default="Neutral")
+        sources = rng.choice(SOURCES, n, p=[0.6, 0.25, 0.15])
+        seconds = rng.integers(0, days * 86400, n)
+        with conn:
+            conn.executemany(sql, [
+                (src, text, label, float(score), content_hash(text),
+                 (start_day + datetime.timedelta(seconds=int(sec))).strftime("%Y-%m-%d %H:%M:%S"))
+                for src, text, label, score, sec in zip(sources, texts, labels, scores, seconds)
+            ])
+        done += n
+        print(f"\rrows: {done}/{rows}", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    if token_index:
+        rebuild_token_index(path)
+    if lsh_index:
+        from dedup import index_stored_rows
+        index_stored_rows(conn)
+    return conn.execute("SELECT COUNT(*) FROM sentiment_data").fetchone()[0] - before
+
+
+def write_wav(path, seconds=1.0, sr=16000, freq=440.0, seed=0):
+    """Mono 16-bit PCM tone plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    signal = 0.4 * np.sin(2 * np.pi * freq * t) + 0.05 * rng.standard_normal(len(t))
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sr)
+        f.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def write_image(path, size=(320, 240), seed=0):
+    """Random-gradient RGB image as binary PPM (readable by cv2.imread)."""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    base = np.linspace(0, 255, w, dtype=np.float32)[None, :, None]
+    img = (base * rng.random(3) + rng.integers(0, 40, (h, w, 3))).clip(0, 255).astype(np.uint8)
+    with open(path, "wb") as f:
+        f.write(f"P6 {w} {h} 255\n".encode("ascii"))
+        f.write(img.tobytes())
+
+
+def build_media(out_dir, n, seed=0):
+    """
+    Write `n` WAV files, `n` images and dataset.csv
+    (text,audio_path,image_path,label) under `out_dir`.
+
+    Returns:
+        str: Path of the dataset CSV.
+    """
+    import csv
+
+    gen = TextGenerator(seed)
+    audio_dir = os.path.join(out_dir, "audio")
+    image_dir = os.path.join(out_dir, "images")
+    os.makedirs(audio_dir, exist_ok=True)
+    os.makedirs(image_dir, exist_ok=True)
+    labels = ["Positive", "Neutral", "Negative"]
+    csv_path = os.path.join(out_dir, "dataset.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["text", "audio_path", "image_path", "label"])
+        for i in range(n):
+            label = labels[i % 3]
+            audio = os.path.join(audio_dir, f"clip_{i:05d}.wav")
+            image = os.path.join(image_dir, f"img_{i:05d}.ppm")
+            write_wav(audio, freq=220.0 * (1 + i % 3), seed=seed + i)
+            write_image(image, seed=seed + i)
+            writer.writerow([gen.tweet(), audio, image, label])
+    return csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark data")
+    parser.add_argument('--out', default=os.path.join("data", "bench"), help="Output directory")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="sentiment_data rows")
+    parser.add_argument('--days', type=int, default=90, help="Days the rows are spread over")
+    parser.add_argument('--media', type=int, default=100, help="WAV/image pairs")
+    parser.add_argument('--texts', type=int, default=10_000, help="Texts written to texts.txt")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-token-index', action='store_true', help="Skip the word-cloud index")
+    parser.add_argument('--lsh-index', action='store_true', help="Also build the near-duplicate index")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "texts.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(TextGenerator(args.seed).texts(args.texts)))
+    if args.rows:
+        stored = build_database(os.path.join(args.out, "bench.db"), args.rows, args.days,
+                                seed=args.seed, token_index=not args.no_token_index,
+                                lsh_index=args.lsh_index)
+        print(f"bench.db   : {stored} rows stored")
+    if args.media:
+        print(f"dataset    : {build_media(args.out, args.media, args.seed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+async_collection.py
+
+Concurrent collection layer for web pages and NewsAPI queries (aiohttp).
+
+- One shared ClientSession with per-host connection pooling
+- A fixed pool of worker coroutines bounds in-flight requests
+- Per-request timeouts, retries with exponential backoff on
+  connection errors, timeouts, 429 and 5xx responses
+- Results are yielded as soon as each URL/query finishes; a job that
+  fails for any reason becomes an error item, never a stalled stream
+- Bodies are decoded leniently, and HTML is parsed in a thread pool so
+  a large page does not block the other fetches
+
+`stream_collected()` exposes the same stream to synchronous code (the
+scoring loop in main.py) through a bounded queue.
+
+Example:
+    for item in stream_collected(urls=["https://example.com/a", ...]):
+        for text in item["texts"]:
+            analyze_and_classify(text)
+"""
+
+import json
+import asyncio
+import queue
+import random
+import threading
+
+import aiohttp
+
+import data_collection
+from data_collection import NEWS_API_URL, SCRAPE_HEADERS, extract_paragraphs
+from instrumentation import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _Retryable(Exception):
+    pass
+
+
+class AsyncCollector:
+    """
+    Fetch many URLs / news queries concurrently.
+
+    Parameters:
+        concurrency (int): Maximum requests in flight overall.
+        per_host (int): Maximum open connections per host.
+        timeout (float): Total seconds allowed per request attempt.
+        retries (int): Extra attempts after the first failure.
+        backoff (float): Base delay in seconds; attempt n waits backoff * 2**n (+ jitter).
+        news_url (str): NewsAPI endpoint (point at a stub server in tests).
+        news_api_key (str): NewsAPI key (default: config.NEWS_API_KEY).
+        verify_ssl (bool): Verify TLS certificates (off by default, like scrape_web_page).
+    """
+
+    def __init__(self, concurrency=20, per_host=4, timeout=10, retries=3, backoff=0.5,
+                 news_url=NEWS_API_URL, news_api_key=None, verify_ssl=False):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.news_url = news_url
+        self.news_api_key = news_api_key or getattr(getattr(data_collection, 'config', None), 'NEWS_API_KEY', None)
+        self.verify_ssl = verify_ssl
+
+    def _session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            ssl=None if self.verify_ssl else False,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=SCRAPE_HEADERS,
+        )
+
+    async def _get(self, session, url, params=None, as_json=False):
+        """GET with retries; returns text (undecodable bytes replaced) or decoded JSON."""
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status in RETRY_STATUSES:
+                        raise _Retryable(f"HTTP {response.status}")
+                    response.raise_for_status()
+                    text = await response.text(errors="replace")
+                    return json.loads(text) if as_json else text
+            except (_Retryable, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _fetch_page(self, session, url):
+        html = await self._get(session, url)
+        return await asyncio.get_running_loop().run_in_executor(None, extract_paragraphs, html)
+
+    async def _fetch_news(self, session, query, page_size):
+        params = {"q": query, "pageSize": page_size, "apiKey": self.news_api_key}
+        data = await self._get(session, self.news_url, params=params, as_json=True)
+        if not isinstance(data, dict):
+            raise ValueError(f"unexpected NewsAPI response ({type(data).__name__})")
+        articles = data.get("articles") or []
+        return [f"{a.get('title','')} {a.get('description','')}".strip() for a in articles]
+
+    async def _handle(self, session, job, page_size):
+        source, key = job
+        try:
+            if source == "web":
+                texts = await self._fetch_page(session, key)
+            else:
+                texts = await self._fetch_news(session, key, page_size)
+            return {"source": source, "key": key, "texts": texts, "error": None}
+        except Exception as e:
+            # anything else (bad JSON, parser errors, ...) must still produce
+            # an item, or collect() would wait for it forever
+            error = str(e) or type(e).__name__
+            print(f"Error collecting {key}: {error}")
+            metrics.count("collect_errors")
+            return {"source": source, "key": key, "texts": [], "error": error}
+
+    async def collect(self, urls=(), queries=(), page_size=10):
+        """
+        Async generator over collected items, in completion order.
+
+        Parameters:
+            urls (iterable): Web pages to scrape for paragraphs.
+            queries (iterable): NewsAPI search queries.
+            page_size (int): Articles per news query.
+
+        Yields:
+            dict: {"source": "web"|"news", "key": url or query,
+                   "texts": [str, ...], "error": None or message}
+        """
+        jobs = [("web", u) for u in urls]
+        if queries and not self.news_api_key:
+            print("No NEWS_API_KEY found in config.py. Please add 'NEWS_API_KEY' for news functionality.")
+        elif queries:
+            jobs += [("news", q) for q in queries]
+        if not jobs:
+            return
+
+        pending = asyncio.Queue()
+        for job in jobs:
+            pending.put_nowait(job)
+        results = asyncio.Queue(maxsize=2 * self.concurrency)
+
+        async with self._session() as session:
+            async def worker():
+                while True:
+                    try:
+                        job = pending.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await results.put(await self._handle(session, job, page_size))
+
+            workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(jobs)))]
+            try:
+                for _ in range(len(jobs)):
+                    yield await results.get()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+
+_DONE = object()
+
+
+def stream_collected(urls=(), queries=(), page_size=10, buffer=100, **collector_kwargs):
+    """
+    Synchronous generator over `AsyncCollector.collect()`.
+
+    The event loop runs in a background thread and hands items over a
+    bounded queue, so a slow consumer applies backpressure to the crawl.
+    """
+    items = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+
+    async def pump():
+        loop = asyncio.get_running_loop()
+        collector = AsyncCollector(**collector_kwargs)
+        async for item in collector.collect(urls, queries, page_size):
+            if stop.is_set():
+                break
+            await loop.run_in_executor(None, items.put, item)
+
+    def runner():
+        try:
+            asyncio.run(pump())
+        except BaseException as e:
+            items.put(e)
+        finally:
+            items.put(_DONE)
+
+    thread = threading.Thread(target=runner, name="async-collector", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # drain so a blocked producer can observe `stop` and exit
+        while thread.is_alive():
+            try:
+                items.get(timeout=0.1)
+            except queue.Empty:
+                pass
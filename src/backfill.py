@@ -0,0 +1,260 @@
+"""
+backfill.py
+
+Resumable bulk ingestion of archived posts:
+
+    JSONL / CSV dump, or a list of URLs
+        ──(chunks)──> dedup ──> score ──> one SQLite transaction:
+                                           rows + token counts + checkpoint
+
+Each chunk of input records is scored and written in a single
+transaction that also records the byte offset the chunk ended at in
+`backfill_checkpoints`. A job that dies (crash, Ctrl-C, reboot) restarts
+from the last committed offset: nothing before it is re-read, and a
+chunk that was scored but not committed is simply read again. Exact
+duplicates are never stored twice either way (see dedup.py).
+
+    run_backfill("twitter", "archive/tweets-2024-09.jsonl", workers=4)
+"""
+
+import io
+import os
+import csv
+import json
+from collections import deque, namedtuple
+
+from database import get_connection, initialize_db, content_hash, write_rows
+from instrumentation import metrics
+
+DEFAULT_CHUNK_SIZE = 2000
+TEXT_FIELDS = ("text", "full_text", "content", "body", "description", "title")
+FORMATS = ("jsonl", "csv", "urls")
+
+# texts (str) of one input chunk, the byte offset it ends at, and how many
+# input records (lines / CSV rows / URLs) it covered
+Chunk = namedtuple("Chunk", ["texts", "end_offset", "records"])
+
+
+def detect_format(path):
+    """'jsonl', 'csv' or 'urls' from the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if ext == ".csv":
+        return "csv"
+    return "urls"
+
+
+def record_text(record, text_field=None):
+    """The text of a JSON object / CSV row: `text_field`, or the first non-empty of TEXT_FIELDS."""
+    if isinstance(record, str):
+        return record
+    if not isinstance(record, dict):
+        return ""
+    if text_field:
+        return str(record.get(text_field) or "")
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        if value:
+            return str(value)
+    return ""
+
+
+# ── Readers: each yields (record, byte offset after it) from `start` ─────────
+def _iter_jsonl(f, start):
+    f.seek(start)
+    for line in iter(f.readline, b""):
+        line = line.strip()
+        record = None
+        if line:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                metrics.count("backfill_bad_records")
+        yield record, f.tell()
+
+
+def _read_csv_record(f):
+    # one CSV record, which may span several lines inside quoted fields
+    line = f.readline()
+    while line and line.count(b'"') % 2:
+        more = f.readline()
+        if not more:
+            break
+        line += more
+    return line
+
+
+def _iter_csv(f, start):
+    f.seek(0)
+    header = next(csv.reader(io.StringIO(_read_csv_record(f).decode("utf-8-sig"))), [])
+    if start > f.tell():
+        f.seek(start)
+    while True:
+        line = _read_csv_record(f)
+        if not line:
+            return
+        values = next(csv.reader(io.StringIO(line.decode("utf-8", errors="replace"))), None)
+        yield (dict(zip(header, values)) if values else None), f.tell()
+
+
+def _iter_urls(f, start):
+    f.seek(start)
+    for line in iter(f.readline, b""):
+        url = line.decode("utf-8", errors="replace").strip()
+        yield (url if url and not url.startswith("#") else None), f.tell()
+
+
+_READERS = {"jsonl": _iter_jsonl, "csv": _iter_csv, "urls": _iter_urls}
+
+
+def iter_chunks(f, input_format, start=0, chunk_size=DEFAULT_CHUNK_SIZE, text_field=None):
+    """
+    Read an open binary file from byte offset `start` in chunks.
+
+    For 'urls' the chunk texts are the URLs themselves (fetched later);
+    otherwise they are the record texts, with empty ones dropped.
+
+    Yields:
+        Chunk: texts, end_offset, records.
+    """
+    texts, records, offset = [], 0, start
+    for record, offset in _READERS[input_format](f, start):
+        records += 1
+        if record is not None:
+            text = record_text(record, text_field).strip()
+            if text:
+                texts.append(text)
+        if records >= chunk_size:
+            yield Chunk(texts, offset, records)
+            texts, records = [], 0
+    if records:
+        yield Chunk(texts, offset, records)
+
+
+def fetch_pages(urls):
+    """Paragraph texts of every URL, crawled concurrently (see async_collection)."""
+    from async_collection import stream_collected
+
+    texts = []
+    for item in stream_collected(urls=urls):
+        if item["error"]:
+            metrics.count("backfill_fetch_errors")
+        texts.extend(item["texts"])
+    return texts
+
+
+# ── Checkpoints ──────────────────────────────────────────────────────────────
+def load_checkpoint(conn, job):
+    """The stored checkpoint of `job` as a dict, or None."""
+    cur = conn.execute("SELECT * FROM backfill_checkpoints WHERE job = ?", (job,))
+    row = cur.fetchone()
+    return dict(zip([c[0] for c in cur.description], row)) if row else None
+
+
+def save_checkpoint(conn, checkpoint):
+    """Upsert `checkpoint` (caller commits, together with the chunk's rows)."""
+    conn.execute('''
+        INSERT OR REPLACE INTO backfill_checkpoints
+            (job, input_format, source, byte_offset, input_size, records_read,
+             rows_written, duplicates, updated_at)
+        VALUES (:job, :input_format, :source, :byte_offset, :input_size, :records_read,
+                :rows_written, :duplicates, CURRENT_TIMESTAMP)
+    ''', checkpoint)
+
+
+# ── Job ──────────────────────────────────────────────────────────────────────
+def _score_chunks(text_chunks, workers):
+    # (labels, compound scores, cleaned texts) per chunk, in order
+    if workers and workers > 1:
+        from parallel_scoring import iter_score_chunks
+        for scores, labels, cleaned in iter_score_chunks(text_chunks, workers, with_cleaned=True):
+            yield labels.tolist(), scores[:, 3].tolist(), cleaned
+    else:
+        from sentiment_analysis import analyze_and_classify_batch
+        for texts in text_chunks:
+            with metrics.stage("backfill_score", items=len(texts)):
+                scored = analyze_and_classify_batch(texts, with_cleaned=True)
+            yield scored['label'].tolist(), scored['compound'].tolist(), scored['cleaned'].tolist()
+
+
+def run_backfill(source, path, input_format=None, job=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 text_field=None, workers=1, dedup=None, restart=False, db_path=None,
+                 progress=print):
+    """
+    Ingest `path` into `sentiment_data`, resuming from the job's checkpoint.
+
+    Parameters:
+        source (str): Value stored in the `source` column.
+        path (str): JSONL / CSV dump, or a text file with one URL per line.
+        input_format (str): 'jsonl', 'csv' or 'urls' (default: from the extension).
+        job (str): Checkpoint key (default: the absolute input path).
+        chunk_size (int): Input records per transaction.
+        text_field (str): JSON key / CSV column holding the text
+            (default: the first non-empty of TEXT_FIELDS).
+        workers (int): Scoring processes; chunks are scored ahead of the
+            writer, but checkpoints still advance strictly in order.
+        dedup (dedup.Deduplicator): Also drop near duplicates.
+        restart (bool): Ignore the stored checkpoint and start at byte 0.
+        db_path (str): Database file (default: database.DB_PATH).
+        progress (callable): Called with a status line after each chunk.
+
+    Returns:
+        dict: The final checkpoint (byte_offset, records_read, rows_written, ...).
+    """
+    input_format = input_format or detect_format(path)
+    job = job or os.path.abspath(path)
+    initialize_db(db_path)
+    conn = get_connection(db_path)
+    size = os.path.getsize(path)
+
+    checkpoint = None if restart else load_checkpoint(conn, job)
+    if checkpoint is None:
+        checkpoint = {"job": job, "input_format": input_format, "source": source, "byte_offset": 0,
+                      "records_read": 0, "rows_written": 0, "duplicates": 0}
+    elif checkpoint["byte_offset"] > size:
+        raise ValueError(f"{path} is smaller ({size} bytes) than the checkpoint of job {job!r} "
+                         f"({checkpoint['byte_offset']} bytes); pass restart=True to start over")
+    elif (checkpoint["input_format"], checkpoint["source"]) != (input_format, source):
+        raise ValueError(f"job {job!r} was started as {checkpoint['input_format']}/"
+                         f"{checkpoint['source']}; pass restart=True to start over")
+    checkpoint["input_size"] = size
+    if checkpoint["byte_offset"] and progress:
+        progress(f"Resuming {job} at byte {checkpoint['byte_offset']:,} of {size:,} "
+                 f"({checkpoint['rows_written']:,} rows already written)")
+
+    # (chunk, texts before dedup, texts to store) queued for scoring, not yet committed
+    pending = deque()
+
+    def text_chunks(f):
+        for chunk in iter_chunks(f, input_format, checkpoint["byte_offset"], chunk_size, text_field):
+            collected = fetch_pages(chunk.texts) if input_format == "urls" else chunk.texts
+            texts = collected if dedup is None else list(dedup.iter_unique(source, collected))
+            pending.append((chunk, len(collected), texts))
+            yield texts
+
+    try:
+        with open(path, "rb") as f:
+            for labels, compounds, cleaned in _score_chunks(text_chunks(f), workers):
+                chunk, collected, texts = pending.popleft()
+                rows = [(source, text, label, compound, content_hash(text), clean)
+                        for text, label, compound, clean in zip(texts, labels, compounds, cleaned)]
+                with metrics.stage("backfill_write", items=len(rows)), conn:
+                    kept = write_rows(conn, rows, dedup=dedup)
+                    checkpoint["byte_offset"] = chunk.end_offset
+                    checkpoint["records_read"] += chunk.records
+                    checkpoint["rows_written"] += len(kept)
+                    checkpoint["duplicates"] += collected - len(kept)
+                    save_checkpoint(conn, checkpoint)
+                metrics.count("backfill_records", chunk.records)
+                if progress:
+                    progress(f"{checkpoint['byte_offset'] / max(size, 1):6.1%}  "
+                             f"{checkpoint['records_read']:,} records, "
+                             f"{checkpoint['rows_written']:,} rows written, "
+                             f"{checkpoint['duplicates']:,} duplicates")
+    except KeyboardInterrupt:
+        if progress:
+            progress(f"Interrupted; committed up to byte {checkpoint['byte_offset']:,}. "
+                     f"Run the same command again to resume.")
+        raise
+    return checkpoint
@@ -0,0 +1,215 @@
+"""
+compiled_lexicon.py
+
+The merged VADER + Pidgin lexicon compiled once into a compact on-disk
+form, loaded memory-mapped at startup and scored in a tight loop:
+
+    data/cache/lexicon/<version>/
+        scores.npy     float64 valence per token (memory-mapped)
+        vocab.txt      one token per line, line i <-> scores[i]
+        phrases.json   trie of multi-word Pidgin entries ("gbas gbos")
+        meta.json      version and the VADER rule words (see below)
+
+Multi-word Pidgin entries are merged into one token ("gbas_gbos") before
+scoring, so they score as a single lexicon item. Texts that contain no
+VADER rule words (negations, boosters, "but", idiom words, ...) and no
+punctuation or capitals score exactly as VADER would from the lexicon
+values alone; `polarity_scores` returns None for every other text so the
+caller can fall back to the full VADER rule walk.
+"""
+
+import os
+import re
+import json
+import math
+import shutil
+
+import numpy as np
+
+COMPILED_LEXICON_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache", "lexicon")
+PHRASE_JOINER = "_"
+_END = ""  # trie key marking the end of a phrase
+
+# anything outside lowercase letters, digits, "_" and whitespace may
+# trigger VADER's punctuation / capitalisation / emoticon rules
+_NEEDS_VADER_RE = re.compile(r"[^a-z0-9_\s]")
+
+
+def vader_rule_words(constants):
+    """
+    Words that make VADER deviate from a plain sum of lexicon valences,
+    read from a `nltk.sentiment.vader.VaderConstants` instance.
+    """
+    words = {"but", "kind", "least", "never", "no"}
+    words.update(w.lower() for w in getattr(constants, "NEGATE", ()))
+    for key in list(getattr(constants, "BOOSTER_DICT", {})) + list(getattr(constants, "SPECIAL_CASE_IDIOMS", {})):
+        words.update(key.lower().split())
+    return sorted(words)
+
+
+def compile_lexicon(base_lexicon, pidgin_lexicon, out_dir, rule_words=(), version=""):
+    """
+    Write the compiled lexicon to `out_dir` (atomically).
+
+    Parameters:
+        base_lexicon (dict): VADER's token -> valence.
+        pidgin_lexicon (dict): Pidgin entries; multi-word keys become phrases.
+        out_dir (str): Target directory; left alone if it already exists.
+        rule_words (iterable): See `vader_rule_words`.
+        version (str): Stored in meta.json.
+    """
+    merged = {tok: val for tok, val in base_lexicon.items() if len(tok.split()) == 1}
+    phrases = {}
+    for entry, val in pidgin_lexicon.items():
+        words = entry.lower().split()
+        if len(words) > 1:
+            node = phrases
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_END] = PHRASE_JOINER.join(words)
+            merged[PHRASE_JOINER.join(words)] = val
+        elif words:
+            merged[words[0]] = val
+
+    vocab = sorted(merged)
+    tmp = f"{out_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "scores.npy"), np.array([merged[t] for t in vocab], dtype=np.float64))
+    with open(os.path.join(tmp, "vocab.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab))
+    with open(os.path.join(tmp, "phrases.json"), "w", encoding="utf-8") as f:
+        json.dump(phrases, f, ensure_ascii=False)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": version, "size": len(vocab), "rule_words": sorted(rule_words)}, f)
+    try:
+        os.rename(tmp, out_dir)
+    except OSError:
+        # another process compiled the same version first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class CompiledLexicon:
+    """Read-only view of a directory written by `compile_lexicon`."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.rule_words = frozenset(meta["rule_words"])
+        self.scores = np.load(os.path.join(path, "scores.npy"), mmap_mode="r")
+        with open(os.path.join(path, "vocab.txt"), encoding="utf-8") as f:
+            self.index = {tok: i for i, tok in enumerate(f.read().split("\n"))}
+        with open(os.path.join(path, "phrases.json"), encoding="utf-8") as f:
+            self.phrases = json.load(f)
+        self._phrase_starts = frozenset(self.phrases)
+
+    def __len__(self):
+        return len(self.index)
+
+    def phrase_entries(self):
+        """Merged phrase tokens and their valences, for VADER's own lexicon."""
+        found, stack = {}, [self.phrases]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == _END:
+                    found[child] = float(self.scores[self.index[child]])
+                else:
+                    stack.append(child)
+        return found
+
+    def merge_phrases(self, text):
+        """Replace every (longest) multi-word phrase with its joined token."""
+        tokens = text.split()
+        if self._phrase_starts.isdisjoint(tokens):
+            return text
+        out, i, n = [], 0, len(tokens)
+        while i < n:
+            node, j, match, match_end = self.phrases.get(tokens[i]), i + 1, None, i
+            while node is not None:
+                if _END in node:
+                    match, match_end = node[_END], j
+                if j >= n:
+                    break
+                node, j = node.get(tokens[j]), j + 1
+            if match is None:
+                out.append(tokens[i])
+                i += 1
+            else:
+                out.append(match)
+                i = match_end
+        return " ".join(out)
+
+    def polarity_scores_batch(self, texts):
+        """
+        VADER scores for each text (phrases merged first), or None for
+        texts that need VADER's full rule walk.
+
+        Returns:
+            list: dicts with neg/neu/pos/compound, or None.
+        """
+        index, rule_words = self.index, self.rule_words
+        spans, flat, results = [], [], [None] * len(texts)
+        for k, text in enumerate(texts):
+            text = self.merge_phrases(text)
+            if _NEEDS_VADER_RE.search(text):
+                continue
+            # VADER ignores single-character tokens
+            tokens = [w for w in text.split() if len(w) > 1]
+            if not rule_words.isdisjoint(tokens):
+                continue
+            spans.append((k, len(flat), len(flat) + len(tokens)))
+            flat.extend(index.get(w, -1) for w in tokens)
+
+        # one gather from the memory-mapped scores for the whole batch
+        flat = np.asarray(flat, dtype=np.int64)
+        valences = np.where(flat >= 0, self.scores[np.maximum(flat, 0)], 0.0).tolist() if len(flat) else []
+        for k, start, end in spans:
+            results[k] = _score_valence(valences[start:end])
+        return results
+
+    def polarity_scores(self, text):
+        return self.polarity_scores_batch([text])[0]
+
+
+def _score_valence(sentiments):
+    # VADER's score_valence / _sift_sentiment_scores for text without
+    # punctuation emphasis, in the same order of float operations
+    if not sentiments:
+        return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+    sum_s = float(sum(sentiments))
+    compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+    compound = min(1.0, max(-1.0, compound))
+    pos_sum, neg_sum, neu_count = 0.0, 0.0, 0
+    for s in sentiments:
+        if s > 0:
+            pos_sum += s + 1
+        elif s < 0:
+            neg_sum += s - 1
+        else:
+            neu_count += 1
+    total = pos_sum + math.fabs(neg_sum) + neu_count
+    return {"neg": round(math.fabs(neg_sum / total), 3),
+            "neu": round(math.fabs(neu_count / total), 3),
+            "pos": round(math.fabs(pos_sum / total), 3),
+            "compound": round(compound, 4)}
+
+
+def load_or_compile(version, build, root=COMPILED_LEXICON_DIR):
+    """
+    Load the compiled lexicon for `version`, compiling it first if needed.
+
+    Parameters:
+        version (str): Scoring version (lexicon + NLTK); one directory each.
+        build (callable): Returns (base_lexicon, pidgin_lexicon, rule_words);
+            only called on a cache miss.
+        root (str): Parent directory of the compiled versions.
+    """
+    path = os.path.join(root, version)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        base, pidgin, rule_words = build()
+        os.makedirs(root, exist_ok=True)
+        compile_lexicon(base, pidgin, path, rule_words, version)
+    return CompiledLexicon(path)
@@ -2,6 +2,7 @@ import streamlit as st
 import sqlite3
 import pandas as pd
 import os
+from contextlib import closing
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 
@@ -31,35 +32,125 @@ if theme == "dark":
 # Database path explicitly set
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "edo_election_sentiment.db")
 
-# Connect explicitly to SQLite database
+# Make sure the schema (indexes + rollup tables) is current before reading
+@st.cache_resource
+def ensure_schema():
+    from database import initialize_db
+    initialize_db(DB_PATH)
+
+ensure_schema()
+
+import queries
+
+PAGE_SIZE = 50
+
+def connect():
+    return closing(sqlite3.connect(DB_PATH))
+
+# Cache keys include a write counter maintained by triggers, so any insert,
+# rescore or delete invalidates the aggregates while unchanged data is
+# served from cache.
+with connect() as conn:
+    data_version = queries.data_version(conn)
+    all_sources = queries.list_sources(conn)
+    first_day, last_day = queries.date_bounds(conn)
+
+# Sidebar filters, applied inside the SQL
+st.sidebar.header("Filters")
+start_date = end_date = None
+if first_day is not None:
+    date_range = st.sidebar.date_input("Date range", value=(first_day, last_day),
+                                       min_value=first_day, max_value=last_day)
+    if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+        start_date, end_date = date_range
+        if (start_date, end_date) == (first_day, last_day):
+            start_date = end_date = None  # full range: let the rollups answer
+selected_sources = st.sidebar.multiselect("Sources", all_sources, default=[])
+sources = tuple(selected_sources) or None
+from parquet_export import load_state
+has_export = load_state() is not None
+use_parquet = st.sidebar.checkbox("Read from Parquet export", value=has_export, disabled=not has_export,
+                                  help="Aggregates from data/parquet plus newer SQLite rows "
+                                       "(see main.py export-parquet)")
+
+SCORE_BINS = 40
+
+# Label/daily/source counts and the score histogram. Unfiltered counts come
+# from the rollup tables. With the Parquet export, everything else is one
+# scan of only the needed columns, date/source partitions pruned, plus the
+# rows stored since; otherwise indexed GROUP BYs in SQLite (the histogram
+# binned there too).
 @st.cache_data
-def load_data():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM sentiment_data", conn, parse_dates=["date_collected"])
-    conn.close()
-    return df
+def load_aggregates(start, end, sources, use_parquet, version):
+    filtered = start is not None or end is not None or bool(sources)
+    agg = None
+    if use_parquet:
+        from parquet_export import aggregate_sentiment
+        agg = aggregate_sentiment(start, end, sources, bins=SCORE_BINS, counts=filtered, db_path=DB_PATH)
+    with connect() as conn:
+        if agg is None:
+            agg = {"histogram": queries.score_histogram(conn, start, end, sources, bins=SCORE_BINS)}
+        if "labels" not in agg:
+            agg.update(labels=queries.label_counts(conn, start, end, sources),
+                       daily=queries.daily_counts(conn, start, end, sources),
+                       sources=queries.source_counts(conn, start, end, sources))
+    return agg["labels"], agg["daily"], agg["sources"], agg["histogram"]
 
-data = load_data()
+@st.cache_data
+def load_page(start, end, sources, before_id, version):
+    with connect() as conn:
+        return queries.fetch_rows(conn, start, end, sources, limit=PAGE_SIZE, before_id=before_id)
+
+sentiment_counts, daily_counts, source_counts, histogram = load_aggregates(
+    start_date, end_date, sources, use_parquet, data_version)
 
 # Dashboard Title
 st.title("📊 Edo State Election, 2024: Opinion Mining Dashboard")
 
-# Explicitly show data
-st.header("📋 Sentiment Analysis Data (first 50 rows)")
-st.dataframe(data.head(50))
+# Latest rows: fetch only ids above the last one seen in this session
+st.header("🆕 Latest Rows")
+filters = (start_date, end_date, sources)
+if st.session_state.get("feed_filters") != filters:
+    st.session_state.feed_filters = filters
+    st.session_state.feed = pd.DataFrame()
+    st.session_state.last_id = 0
+st.button("🔄 Refresh")  # a click reruns the script; the fetch below is incremental
+with connect() as conn:
+    new_rows = queries.fetch_new_rows(conn, st.session_state.last_id,
+                                      start_date, end_date, sources, limit=PAGE_SIZE)
+if not new_rows.empty:
+    st.session_state.last_id = int(new_rows['id'].max())
+    st.session_state.feed = pd.concat([new_rows, st.session_state.feed]).head(PAGE_SIZE)
+st.dataframe(st.session_state.feed)
+
+# Paginated browse, keyset pagination in SQL: each page starts below the
+# lowest id of the one before, so deep pages are as cheap as the first
+st.header("📋 Sentiment Analysis Data")
+total_rows = int(sentiment_counts.sum())
+n_pages = max(1, -(-total_rows // PAGE_SIZE))
+if st.session_state.get("page_filters") != filters:
+    st.session_state.page_filters = filters
+    st.session_state.page_cursors = [None]  # before_id of each page visited so far
+cursors = st.session_state.page_cursors
+col_newer, col_older = st.columns(2)
+if col_newer.button("◀ Newer", disabled=len(cursors) == 1):
+    cursors.pop()
+page_rows = load_page(start_date, end_date, sources, cursors[-1], data_version)
+if col_older.button("Older ▶", disabled=len(page_rows) < PAGE_SIZE):
+    cursors.append(int(page_rows['id'].min()))
+    page_rows = load_page(start_date, end_date, sources, cursors[-1], data_version)
+st.caption(f"Page {len(cursors)} of {n_pages} ({total_rows} rows)")
+st.dataframe(page_rows)
 
 # Explicitly show sentiment distribution (Pie Chart)
 st.header("🥧 Overall Sentiment Distribution")
-sentiment_counts = data['sentiment_label'].value_counts()
 fig1, ax1 = plt.subplots()
 ax1.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', colors=['#66b3ff','#ff9999','#99ff99'])
 st.pyplot(fig1)
 
 # 3) Time-series trend
 st.header("📈 Daily Sentiment Trend")
-# extract date
-data['date'] = data['date_collected'].dt.date
-ts = data.groupby(['date','sentiment_label']).size().unstack(fill_value=0)
+ts = daily_counts.pivot(index='day', columns='sentiment_label', values='n').fillna(0)
 fig2, ax2 = plt.subplots(figsize=(8,4))
 ts.plot(ax=ax2)
 ax2.set_xlabel("Date")
@@ -69,39 +160,74 @@ st.pyplot(fig2)
 
 # 4) Source breakdown
 st.header("📊 Sentiment by Source")
-src = data.groupby(['source','sentiment_label']).size().unstack(fill_value=0)
+src = source_counts.pivot(index='source', columns='sentiment_label', values='n').fillna(0)
 fig3, ax3 = plt.subplots(figsize=(6,4))
 src.plot(kind='bar', stacked=True, ax=ax3)
 ax3.set_xlabel("Source")
 ax3.set_ylabel("Count")
 st.pyplot(fig3)
 
+# Score distribution per label, from pre-binned counts
+st.header("📉 Sentiment Score Distribution")
+if histogram.empty:
+    st.info("No rows for the current filters.")
+else:
+    width = 2 / SCORE_BINS
+    fig5, ax5 = plt.subplots(figsize=(8,4))
+    for label, group in histogram.groupby('sentiment_label'):
+        ax5.bar(group['bin'] * width - 1, group['n'], width=width, align='edge', alpha=0.6, label=label)
+    ax5.set_xlim(-1, 1)
+    ax5.set_xlabel("Compound score")
+    ax5.set_ylabel("Count")
+    ax5.legend(title="Sentiment")
+    st.pyplot(fig5)
+
+# Duplicates dropped at ingestion, per source
+st.header("🧹 Ingestion Deduplication")
+with connect() as conn:
+    dedup = queries.dedup_stats(conn)
+if dedup.empty:
+    st.info("No dedup statistics yet; they are recorded by `main.py live`.")
+else:
+    st.dataframe(dedup.style.format({'dup_rate': '{:.1%}'}))
+
 # Explicitly generate and show Word Cloud
 st.header("☁️ Word Cloud (Most Frequent Words)")
+cloud_labels = st.multiselect("Sentiment", ["Positive", "Neutral", "Negative"], default=[])
+
+# Top-N from the incrementally maintained token-frequency index
+@st.cache_data
+def load_top_tokens(start, end, sources, labels, version, limit=200):
+    with connect() as conn:
+        return queries.top_tokens(conn, limit, start, end, sources, labels)
 
-# Combine all text explicitly for word cloud
-text_combined = " ".join(data['content'].values)
+frequencies = load_top_tokens(start_date, end_date, sources, tuple(cloud_labels), data_version)
 
-wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text_combined)
+if frequencies:
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies)
 
-fig4, ax4 = plt.subplots(figsize=(10, 5))
-ax4.imshow(wordcloud, interpolation='bilinear')
-ax4.axis("off")
-st.pyplot(fig4)
+    fig4, ax4 = plt.subplots(figsize=(10, 5))
+    ax4.imshow(wordcloud, interpolation='bilinear')
+    ax4.axis("off")
+    st.pyplot(fig4)
+else:
+    st.info("No words for the current filters.")
 
 # 6) Evaluation (if you have a labeled CSV)
 LABELS_CSV = os.path.join(os.path.dirname(__file__), "text_labels.csv")
 
+# Metrics are a stored artifact keyed on the labels file, lexicon and
+# thresholds; they are only recomputed when one of those changes.
+@st.cache_data
+def load_text_evaluation(key):
+    from evaluation import load_evaluation, evaluate_labels_file
+    return load_evaluation(LABELS_CSV) or evaluate_labels_file(LABELS_CSV)
+
 if os.path.exists(LABELS_CSV):
     st.header("🧪 VADER Evaluation on Hand-Labeled Text")
-    eval_df = pd.read_csv(LABELS_CSV)
-    from sentiment_analysis import analyze_and_classify
-    from evaluation import evaluate
-
-    gold = eval_df['gold_label'].tolist()
-    preds = [analyze_and_classify(t)[1] for t in eval_df['text']]
+    from evaluation import evaluation_key
 
-    m = evaluate(gold, preds, labels=['Negative','Neutral','Positive'])
+    m = load_text_evaluation(evaluation_key(LABELS_CSV))
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Accuracy", f"{m['accuracy']:.2%}")
     col2.metric("Precision", f"{m['precision']:.2%}")
@@ -14,9 +14,9 @@ Requirements:
 """
 
 import sys
-import io
 import ssl
 import warnings
+from functools import lru_cache
 import requests
 import tweepy
 from bs4 import BeautifulSoup
@@ -31,7 +31,8 @@ from urllib3.exceptions import InsecureRequestWarning
 warnings.filterwarnings("ignore", category=InsecureRequestWarning)
 
 # Force UTF-8 output (fixes encoding issues with special characters)
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# (reconfigure in place, so importing this module lazily mid-run keeps output ordered)
+sys.stdout.reconfigure(encoding='utf-8')
 
 # ==============================
 # 2) CONFIGURATION
@@ -47,6 +48,11 @@ except ImportError:
 # ==============================
 # 3) TWITTER API DATA COLLECTION
 # ==============================
+@lru_cache(maxsize=1)
+def get_twitter_client():
+    """Build the Tweepy v2 client once per process and reuse it."""
+    return tweepy.Client(bearer_token=config.BEARER_TOKEN, wait_on_rate_limit=True)
+
 def collect_tweets(query="Edo State election", max_results=10):
     """
     Collect tweets using Twitter API v2 via Tweepy.
@@ -62,7 +68,7 @@ def collect_tweets(query="Edo State election", max_results=10):
         print("No BEARER_TOKEN found in config.py. Please add 'BEARER_TOKEN' for Twitter API.")
         return []
 
-    client = tweepy.Client(bearer_token=config.BEARER_TOKEN, wait_on_rate_limit=True)
+    client = get_twitter_client()
 
     try:
         response = client.search_recent_tweets(
@@ -87,6 +93,26 @@ def collect_tweets(query="Edo State election", max_results=10):
 # ==============================
 # 4) WEB SCRAPING DATA COLLECTION
 # ==============================
+SCRAPE_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                   'AppleWebKit/537.36 (KHTML, like Gecko) '
+                   'Chrome/91.0.4472.124 Safari/537.36')
+}
+
+def extract_paragraphs(html):
+    """
+    Extract all non-empty paragraph texts from an HTML document.
+
+    Parameters:
+        html (str): The page source.
+
+    Returns:
+        list: A list of paragraph strings.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    paragraphs = [p.get_text(strip=True) for p in soup.find_all('p')]
+    return [p for p in paragraphs if p]
+
 def scrape_web_page(url):
     """
     Scrape the given URL and extract all non-empty paragraph texts.
@@ -98,16 +124,9 @@ def scrape_web_page(url):
         list: A list of paragraph strings.
     """
     try:
-        headers = {
-            'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                           'AppleWebKit/537.36 (KHTML, like Gecko) '
-                           'Chrome/91.0.4472.124 Safari/537.36')
-        }
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
+        response = requests.get(url, headers=SCRAPE_HEADERS, timeout=10, verify=False)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        paragraphs = [p.get_text(strip=True) for p in soup.find_all('p') if p.get_text(strip=True)]
-        return paragraphs
+        return extract_paragraphs(response.text)
     except requests.exceptions.RequestException as e:
         print(f"Error scraping {url}: {e}")
         return []
@@ -115,6 +134,8 @@ def scrape_web_page(url):
 # ==============================
 # 5) NEWS API DATA COLLECTION
 # ==============================
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+
 def fetch_news(query, page_size=10):
     """
     Fetch news articles from NewsAPI.org based on the query.
@@ -130,7 +151,7 @@ def fetch_news(query, page_size=10):
         print("No NEWS_API_KEY found in config.py. Please add 'NEWS_API_KEY' for news functionality.")
         return []
 
-    url = "https://newsapi.org/v2/everything"
+    url = NEWS_API_URL
     params = {
         "q": query,
         "pageSize": page_size,
@@ -1,34 +1,138 @@
 # src/data_preprocessing.py
 
+import os
 import re
+import sys
+import zipfile
+from functools import lru_cache, partial
 import numpy as np
-import librosa
-import cv2
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from transformers import BertTokenizer
+
+# librosa, cv2 and transformers are imported inside the multimodal helpers
+# below, so the text-only (live / eval) paths never pay for them. nltk is
+# only imported when WordNet is first needed (or the stopword list is not
+# on disk): `import nltk` alone pulls in scipy and sklearn.
+
 
 # ── Ensure NLTK resources are present ────────────────────────────────────────
-nltk.download('stopwords', quiet=True)
-nltk.download('wordnet', quiet=True)
+def ensure_nltk_resource(resource, package):
+    """
+    Check for an NLTK resource on local disk, and only download `package`
+    if it is genuinely missing (normal runs never touch the network).
+    """
+    import nltk
+
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(package, quiet=True)
+
+
+def _nltk_data_dirs():
+    # nltk.data.path's default search order, without importing nltk
+    dirs = [d for d in os.environ.get("NLTK_DATA", "").split(os.pathsep) if d]
+    dirs.append(os.path.expanduser(os.path.join("~", "nltk_data")))
+    dirs += [os.path.join(sys.prefix, *parts) for parts in
+             (("nltk_data",), ("share", "nltk_data"), ("lib", "nltk_data"))]
+    dirs += ["/usr/share/nltk_data", "/usr/local/share/nltk_data",
+             "/usr/lib/nltk_data", "/usr/local/lib/nltk_data"]
+    return dirs
+
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    """
+    NLTK's English stopword list, read straight from nltk_data (the
+    unpacked corpus or its zip); falls back to nltk.corpus, downloading
+    the corpus if it is missing.
+    """
+    for base in _nltk_data_dirs():
+        path = os.path.join(base, "corpora", "stopwords", "english")
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                return frozenset(line.strip() for line in f if line.strip())
+        archive = os.path.join(base, "corpora", "stopwords.zip")
+        if os.path.isfile(archive):
+            with zipfile.ZipFile(archive) as z:
+                words = z.read("stopwords/english").decode("utf-8").split("\n")
+            return frozenset(w.strip() for w in words if w.strip())
+    ensure_nltk_resource('corpora/stopwords', 'stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    """WordNet lemmatizer, created (and WordNet checked for) on first use."""
+    ensure_nltk_resource('corpora/wordnet', 'wordnet')
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
 
 # ── BERT tokenizer for multimodal pipeline ───────────────────────────────────
-tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
+@lru_cache(maxsize=None)
+def get_tokenizer(model_name='bert-base-uncased'):
+    """Load the fast (Rust) BERT tokenizer on first use."""
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(model_name, use_fast=True)
+
+
+def __getattr__(name):
+    # keep `data_preprocessing.tokenizer`, `.stop_words` and `.lemmatizer`
+    # working without loading them at import
+    if name == 'tokenizer':
+        return get_tokenizer()
+    if name == 'stop_words':
+        return get_stop_words()
+    if name == 'lemmatizer':
+        return get_lemmatizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def preprocess_text(texts):
+
+def preprocess_text(texts, max_length=128):
     """
-    Tokenize texts for BERT encoding.
-    Used by the multimodal TextModel.encode().
-    Returns a transformers BatchEncoding.
+    Tokenize texts for BERT encoding (padded to the longest text, capped
+    at `max_length`). `models.bert_encoder.BertEncoder` tokenizes in
+    length-bucketed batches instead; use it to get embeddings.
     """
-    encodings = tokenizer(texts, padding=True, truncation=True, return_tensors='pt')
+    encodings = get_tokenizer()(list(texts), padding=True, truncation=True,
+                                max_length=max_length, return_tensors='pt')
     return encodings
 
 
 # ── VADER-style cleaning for live pipeline ────────────────────────────────────
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
+_STRIP_RE = re.compile(r"http\S+|@\S+|#\S+")
+_NON_ALPHA_RE = re.compile(r"[^a-z\s]")
+
+# word -> lemma, filled lazily (or up front by preload_lemmas) so each
+# distinct token goes through WordNet once per process. Capped to keep noisy
+# crawls bounded.
+_lemma_cache = {}
+LEMMA_CACHE_MAX = 500_000
+
+
+def lemmatize_token(word):
+    """Memoized `lemmatizer.lemmatize(word)`."""
+    lemma = _lemma_cache.get(word)
+    if lemma is None:
+        lemma = get_lemmatizer().lemmatize(word)
+        if len(_lemma_cache) < LEMMA_CACHE_MAX:
+            _lemma_cache[word] = lemma
+    return lemma
+
+
+def preload_lemmas(words):
+    """
+    Fill the lemma table from a corpus vocabulary (any iterable of
+    lowercase words, e.g. `database.corpus_vocabulary()`), so WordNet is
+    loaded and the common words resolved before scoring starts.
+    Returns the number of entries in the table.
+    """
+    stop_words = get_stop_words()
+    for word in words:
+        if word not in stop_words:
+            lemmatize_token(word)
+    return len(_lemma_cache)
+
 
 def clean_text_for_vader(text):
     """
@@ -36,43 +140,170 @@ def clean_text_for_vader(text):
     remove non-alpha, remove stop-words, lemmatize.
     Returns a cleaned string ready for VADER.
     """
-    text = text.lower()
-    text = re.sub(r"http\S+|@\S+|#\S+", "", text)
-    text = re.sub(r"[^a-z\s]", "", text)
-    tokens = [
-        lemmatizer.lemmatize(word)
-        for word in text.split()
-        if word not in stop_words
-    ]
+    text = _NON_ALPHA_RE.sub("", _STRIP_RE.sub("", text.lower()))
+    stop_words = get_stop_words()
+    cache = _lemma_cache
+    tokens = []
+    for word in text.split():
+        if word in stop_words:
+            continue
+        lemma = cache.get(word)
+        tokens.append(lemma if lemma is not None else lemmatize_token(word))
     return " ".join(tokens)
 
 
+# ── Shared extraction driver (cache lookup + parallel decode) ────────────────
+def _extract_features(kind, compute, filepaths, params, store, workers, executor,
+                      on_error, progress):
+    """
+    Returns (arrays for the files that succeeded, in input order,
+    failures as [(index, path, exception)]).
+    """
+    from feature_extraction import extract_parallel, print_progress
+
+    if on_error not in ("raise", "skip"):
+        raise ValueError(f"on_error must be 'raise' or 'skip', got {on_error!r}")
+    filepaths = list(filepaths)
+    arrays = [None] * len(filepaths)
+    todo = []
+    for i, fp in enumerate(filepaths):
+        cached = store.get(kind, fp, params) if store is not None else None
+        if cached is None:
+            todo.append(i)
+        else:
+            arrays[i] = cached
+
+    if progress is True:
+        progress = print_progress(f"Extracting {kind}")
+    results, failures = extract_parallel(compute, [filepaths[i] for i in todo],
+                                         workers, executor, progress)
+    failures = [(todo[j], fp, err) for j, fp, err in failures]
+    for j, value in enumerate(results):
+        if value is not None:
+            arrays[todo[j]] = value
+            if store is not None:
+                store.put(kind, filepaths[todo[j]], params, value)
+
+    if failures:
+        if on_error == "raise":
+            raise failures[0][2]
+        print(f"WARNING: skipped {len(failures)} unreadable {kind} file(s): "
+              + ", ".join(str(fp) for _, fp, _ in failures[:5])
+              + (" ..." if len(failures) > 5 else ""))
+    return [a for a in arrays if a is not None], failures
+
+
 # ── Audio preprocessing (MFCC features) ───────────────────────────────────────
-def preprocess_audio(filepaths, sr=16000, n_mfcc=13):
+def mfcc_features(fp, sr=16000, n_mfcc=13):
+    """Mean MFCC vector (n_mfcc,) for one audio file."""
+    import librosa
+
+    y, _ = librosa.load(fp, sr=sr)
+    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc)
+    return np.mean(mfcc, axis=1)
+
+
+def preprocess_audio(filepaths, sr=16000, n_mfcc=13, store=None, workers=1,
+                     on_error="raise", progress=None, return_failed=False):
     """
     Given a list of audio file paths, load each, compute MFCCs,
     and return an (n_samples × n_mfcc) numpy array of mean MFCC features.
+
+    With a `FeatureStore`, files seen before (same path, size, mtime and
+    parameters) are read from the cache instead of being decoded. Misses
+    are decoded across `workers` processes (None = all cores), in order.
+    on_error="skip" leaves unreadable files out instead of raising;
+    return_failed=True also returns the [(index, path, error)] list.
     """
-    features = []
-    for fp in filepaths:
-        y, _ = librosa.load(fp, sr=sr)
-        mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc)
-        features.append(np.mean(mfcc, axis=1))
-    return np.vstack(features)
+    feats, failures = _extract_features(
+        "mfcc", partial(mfcc_features, sr=sr, n_mfcc=n_mfcc), filepaths,
+        {"sr": sr, "n_mfcc": n_mfcc}, store, workers, "process", on_error, progress)
+    features = np.vstack(feats) if feats else np.empty((0, n_mfcc), dtype=np.float32)
+    return (features, failures) if return_failed else features
 
 
 # ── Image preprocessing (resize + normalize) ─────────────────────────────────
-def preprocess_image(filepaths, size=(224, 224)):
+def load_resized_image(fp, size=(224, 224)):
+    """Read one image with OpenCV and resize it; returns uint8 (H, W, C)."""
+    import cv2
+
+    img = cv2.imread(fp)
+    if img is None:
+        raise FileNotFoundError(f"Could not read image file: {fp}")
+    return cv2.resize(img, size)
+
+
+def preprocess_image(filepaths, size=(224, 224), store=None, workers=1,
+                     on_error="raise", progress=None, return_failed=False,
+                     dtype="float32", out=None, chunk_size=1024):
     """
     Given a list of image file paths, load each with OpenCV,
     resize to `size`, normalize pixel values to [0,1],
     and return an array (n_samples, H, W, C).
+
+    With a `FeatureStore`, resized uint8 images are cached on disk and
+    memory-mapped on later runs. Misses are decoded on a thread pool of
+    `workers` threads (cv2 releases the GIL). `on_error`, `progress` and
+    `return_failed` behave as in `preprocess_audio`.
+
+    dtype="uint8" skips the normalization and returns the raw pixels, a
+    quarter of the float32 size; feed them to `iter_image_batches` (or
+    `ImageModel`, which does) to normalize one batch at a time.
+
+    Images are decoded (or read from the store) `chunk_size` at a time and
+    copied into the result. With `out` (a .npy path) the result is a
+    memory-mapped file instead of RAM, so peak memory is bounded by
+    `chunk_size` rather than by the dataset.
+    """
+    if dtype not in ("float32", "uint8"):
+        raise ValueError(f"dtype must be 'float32' or 'uint8', got {dtype!r}")
+    filepaths = list(filepaths)
+    shape = (len(filepaths), size[1], size[0], 3)
+    if out is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        images = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+    else:
+        images = np.empty(shape, dtype=dtype)
+    # chunked either way: cached images come back memory-mapped, one map
+    # (and file handle) each, so only `chunk_size` of them are open at once
+    step = max(1, chunk_size)
+
+    # successes are packed to the front, in input order
+    n, failures = 0, []
+    for start in range(0, len(filepaths), step):
+        imgs, chunk_failures = _extract_features(
+            "image", partial(load_resized_image, size=size), filepaths[start:start + step],
+            {"size": list(size)}, store, workers, "thread", on_error, progress)
+        failures.extend((start + i, fp, err) for i, fp, err in chunk_failures)
+        first = n
+        for img in imgs:
+            images[n] = img
+            n += 1
+        if dtype == "float32":
+            images[first:n] /= 255.0
+    images = images[:n] if n < len(images) else images
+    return (images, failures) if return_failed else images
+
+
+def iter_image_batches(images, batch_size=256, flatten=True):
+    """
+    Yield float32 batches scaled to [0,1] from uint8 (or already float)
+    images of shape (n, H, W, C); memory-mapped input is read one batch
+    at a time, so peak memory is bounded by `batch_size`.
+
+    Parameters:
+        images (array-like): Image array (ndarray or np.memmap).
+        batch_size (int): Images per batch.
+        flatten (bool): Reshape each batch to (batch, H*W*C).
+
+    Yields:
+        numpy.ndarray: One float32 batch.
     """
-    feats = []
-    for fp in filepaths:
-        img = cv2.imread(fp)
-        if img is None:
-            raise FileNotFoundError(f"Could not read image file: {fp}")
-        img = cv2.resize(img, size)
-        feats.append(img.astype(np.float32) / 255.0)
-    return np.stack(feats)
\ No newline at end of file
+    for start in range(0, len(images), batch_size):
+        batch = np.asarray(images[start:start + batch_size])
+        if batch.dtype == np.uint8:
+            batch = batch.astype(np.float32)
+            batch /= 255.0
+        else:
+            batch = batch.astype(np.float32, copy=False)
+        yield batch.reshape(len(batch), -1) if flatten else batch
@@ -2,11 +2,79 @@
 
 import sqlite3
 import os
+import time
+import hashlib
+import atexit
+import threading
+from collections import Counter
+
+from instrumentation import metrics
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "edo_election_sentiment.db")
 
-def initialize_db():
-    conn = sqlite3.connect(DB_PATH)
+# rows already stored for the same source (same content_hash) are skipped
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO sentiment_data
+        (source, content, sentiment_label, sentiment_score, content_hash)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+def content_hash(text):
+    """Exact-duplicate key: hash of the lowercased, whitespace-collapsed text."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+# ── Per-process connection pool ──────────────────────────────────────────────
+# One long-lived connection per (process, thread, database file). Keyed on
+# the pid so that forked workers never share a parent's sqlite handle, and on
+# the thread so that no two threads ever use one connection at the same time
+# (e.g. a writer's background flush and the caller's reads). Concurrent
+# writers then queue on SQLite's own lock, waiting up to BUSY_TIMEOUT.
+_connections = {}
+_connections_lock = threading.Lock()
+BUSY_TIMEOUT = 30.0
+
+
+def get_connection(db_path=None):
+    """
+    Return this thread's long-lived connection for `db_path`, opening it
+    (in WAL mode) on first use.
+    """
+    db_path = db_path or DB_PATH
+    key = (os.getpid(), threading.get_ident(), db_path)
+    with _connections_lock:
+        conn = _connections.get(key)
+        if conn is None:
+            # not bound to this thread only so that close_connections() can
+            # close it from the exiting main thread
+            conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[key] = conn
+        return conn
+
+
+def release_connection(db_path=None):
+    """Close the calling thread's pooled connection for `db_path`, if any."""
+    key = (os.getpid(), threading.get_ident(), db_path or DB_PATH)
+    with _connections_lock:
+        conn = _connections.pop(key, None)
+    if conn is not None:
+        conn.close()
+
+
+def close_connections():
+    """Close every pooled connection opened by this process."""
+    with _connections_lock:
+        for (pid, _, _), conn in list(_connections.items()):
+            if pid == os.getpid():
+                conn.close()
+        _connections.clear()
+
+
+def initialize_db(db_path=None):
+    conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -21,16 +89,553 @@ def initialize_db():
     ''')
 
     conn.commit()
-    conn.close()
+    migrate_db(conn)
 
-def insert_sentiment_data(source, content, sentiment_label, sentiment_score):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
 
-    cursor.execute('''
-        INSERT INTO sentiment_data (source, content, sentiment_label, sentiment_score)
-        VALUES (?, ?, ?, ?)
-    ''', (source, content, sentiment_label, sentiment_score))
+# ── Schema migrations ────────────────────────────────────────────────────────
+# Applied in order; PRAGMA user_version records how many have run, so
+# existing database files are upgraded in place by initialize_db().
+_ROLLUP_ADD = '''
+        INSERT INTO daily_sentiment_rollup (day, sentiment_label, n, score_sum)
+        VALUES (date(NEW.date_collected), NEW.sentiment_label, 1, NEW.sentiment_score)
+        ON CONFLICT (day, sentiment_label) DO UPDATE
+        SET n = n + 1, score_sum = score_sum + excluded.score_sum;
+        INSERT INTO source_sentiment_rollup (source, sentiment_label, n, score_sum)
+        VALUES (NEW.source, NEW.sentiment_label, 1, NEW.sentiment_score)
+        ON CONFLICT (source, sentiment_label) DO UPDATE
+        SET n = n + 1, score_sum = score_sum + excluded.score_sum;
+'''
 
-    conn.commit()
-    conn.close()
+_ROLLUP_REMOVE = '''
+        UPDATE daily_sentiment_rollup SET n = n - 1, score_sum = score_sum - OLD.sentiment_score
+        WHERE day = date(OLD.date_collected) AND sentiment_label = OLD.sentiment_label;
+        UPDATE source_sentiment_rollup SET n = n - 1, score_sum = score_sum - OLD.sentiment_score
+        WHERE source = OLD.source AND sentiment_label = OLD.sentiment_label;
+'''
+
+_ROLLUP_PRUNE = '''
+        DELETE FROM daily_sentiment_rollup WHERE n <= 0;
+        DELETE FROM source_sentiment_rollup WHERE n <= 0;
+'''
+
+MIGRATIONS = [
+    # 1: indexes for the dashboard filters, plus daily×label and source×label
+    #    rollups kept current by triggers (so every writer maintains them)
+    f'''
+    CREATE INDEX IF NOT EXISTS idx_sentiment_date_label
+        ON sentiment_data (date_collected, sentiment_label);
+    CREATE INDEX IF NOT EXISTS idx_sentiment_source_label
+        ON sentiment_data (source, sentiment_label);
+
+    CREATE TABLE IF NOT EXISTS daily_sentiment_rollup (
+        day TEXT NOT NULL,
+        sentiment_label TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        PRIMARY KEY (day, sentiment_label)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS source_sentiment_rollup (
+        source TEXT NOT NULL,
+        sentiment_label TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        PRIMARY KEY (source, sentiment_label)
+    ) WITHOUT ROWID;
+
+    DELETE FROM daily_sentiment_rollup;
+    INSERT INTO daily_sentiment_rollup (day, sentiment_label, n, score_sum)
+        SELECT date(date_collected), sentiment_label, COUNT(*), SUM(sentiment_score)
+        FROM sentiment_data GROUP BY 1, 2;
+    DELETE FROM source_sentiment_rollup;
+    INSERT INTO source_sentiment_rollup (source, sentiment_label, n, score_sum)
+        SELECT source, sentiment_label, COUNT(*), SUM(sentiment_score)
+        FROM sentiment_data GROUP BY 1, 2;
+
+    CREATE TRIGGER IF NOT EXISTS sentiment_rollup_insert
+    AFTER INSERT ON sentiment_data
+    BEGIN {_ROLLUP_ADD} END;
+
+    CREATE TRIGGER IF NOT EXISTS sentiment_rollup_delete
+    AFTER DELETE ON sentiment_data
+    BEGIN {_ROLLUP_REMOVE} {_ROLLUP_PRUNE} END;
+
+    CREATE TRIGGER IF NOT EXISTS sentiment_rollup_update
+    AFTER UPDATE OF source, sentiment_label, sentiment_score, date_collected ON sentiment_data
+    BEGIN {_ROLLUP_REMOVE} {_ROLLUP_ADD} {_ROLLUP_PRUNE} END;
+    ''',
+]
+
+
+def migrate_db(conn):
+    """Bring an existing database up to the latest schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        if callable(script):
+            # Python migrations must be idempotent; they are not one transaction
+            script(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        else:
+            conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+
+
+# ── Token-frequency index (word cloud) ───────────────────────────────────────
+# Token counts per (day, source, label), using the same cleaning as VADER.
+# Maintained in Python at insert time, since the cleaning cannot run in SQL.
+TOKEN_UPSERT_SQL = '''
+    INSERT INTO token_frequencies (day, source, sentiment_label, token, n)
+    VALUES (COALESCE(?, date('now')), ?, ?, ?, ?)
+    ON CONFLICT (day, source, sentiment_label, token) DO UPDATE SET n = n + excluded.n
+'''
+
+
+def row_tokens(row):
+    """
+    Cleaned tokens of a (source, content, label, score, content_hash[, cleaned])
+    row: the sixth field, when the scorer already cleaned the text, otherwise
+    `clean_text_for_vader(content)`.
+    """
+    cleaned = row[5] if len(row) > 5 else None
+    if cleaned is None:
+        from data_preprocessing import clean_text_for_vader
+        cleaned = clean_text_for_vader(row[1])
+    return cleaned.split()
+
+
+def count_tokens(rows, day=None):
+    """
+    Count cleaned tokens per (day, source, label, token).
+
+    Parameters:
+        rows (iterable): (source, content, sentiment_label, ...) tuples,
+            optionally carrying the cleaned text (see `row_tokens`).
+        day (str): 'YYYY-MM-DD' for every row, or None for today.
+    """
+    counts = Counter()
+    for row in rows:
+        source, label = row[0], row[2]
+        for token in row_tokens(row):
+            counts[(day, source, label, token)] += 1
+    return counts
+
+
+def index_tokens(conn, rows, day=None):
+    """Add the tokens of `rows` to token_frequencies (caller commits)."""
+    counts = count_tokens(rows, day)
+    conn.executemany(TOKEN_UPSERT_SQL, [(*key, n) for key, n in counts.items()])
+
+
+def move_token_counts(conn, moved):
+    """
+    Move token counts between labels for rows that were relabelled (caller
+    commits); counts that drop to zero are deleted.
+
+    Parameters:
+        moved (iterable): (day, source, old_label, new_label, tokens) tuples.
+    """
+    removed, added = Counter(), Counter()
+    for day, source, old_label, new_label, tokens in moved:
+        for token in tokens:
+            removed[(day, source, old_label, token)] += 1
+            added[(day, source, new_label, token)] += 1
+    conn.executemany(
+        "UPDATE token_frequencies SET n = n - ? "
+        "WHERE day = ? AND source = ? AND sentiment_label = ? AND token = ?",
+        [(n, *key) for key, n in removed.items()])
+    conn.executemany(
+        "DELETE FROM token_frequencies "
+        "WHERE day = ? AND source = ? AND sentiment_label = ? AND token = ? AND n <= 0",
+        list(removed))
+    conn.executemany(TOKEN_UPSERT_SQL, [(*key, n) for key, n in added.items()])
+
+
+def _rebuild_token_index(conn, chunk_size=5000):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS token_frequencies (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            sentiment_label TEXT NOT NULL,
+            token TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (day, source, sentiment_label, token)
+        ) WITHOUT ROWID
+    ''')
+    with conn:
+        conn.execute("DELETE FROM token_frequencies")
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, date(date_collected), source, content, sentiment_label "
+                "FROM sentiment_data WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            by_day = {}
+            for _, day, source, content, label in rows:
+                by_day.setdefault(day, []).append((source, content, label))
+            for day, day_rows in by_day.items():
+                index_tokens(conn, day_rows, day)
+
+
+def corpus_vocabulary(limit=50_000, db_path=None):
+    """
+    The `limit` most frequent tokens of the stored corpus, from the
+    token-frequency index (empty when there is no database yet).
+    """
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        return []
+    try:
+        return [row[0] for row in get_connection(db_path).execute(
+            "SELECT token FROM token_frequencies GROUP BY token ORDER BY SUM(n) DESC LIMIT ?",
+            (limit,))]
+    except sqlite3.OperationalError:  # not migrated yet
+        return []
+
+
+def rebuild_token_index(db_path=None):
+    """Recompute token_frequencies from every stored row (e.g. after a rescore)."""
+    _rebuild_token_index(get_connection(db_path))
+
+
+MIGRATIONS.append(_rebuild_token_index)  # 2: token_frequencies, backfilled
+
+
+# ── Exact / near-duplicate detection (see dedup.py) ──────────────────────────
+def _add_content_hash(conn, chunk_size=5000):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sentiment_data)")}
+    if "content_hash" not in columns:
+        conn.execute("ALTER TABLE sentiment_data ADD COLUMN content_hash TEXT")
+    with conn:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, content FROM sentiment_data WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            conn.executemany("UPDATE sentiment_data SET content_hash = ? WHERE id = ?",
+                             [(content_hash(content), id_) for id_, content in rows])
+        # duplicates already stored are kept, but only the first copy is hashed
+        conn.execute('''
+            UPDATE sentiment_data SET content_hash = NULL
+            WHERE id NOT IN (SELECT MIN(id) FROM sentiment_data GROUP BY source, content_hash)
+        ''')
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_sentiment_source_hash
+                ON sentiment_data (source, content_hash) WHERE content_hash IS NOT NULL
+        ''')
+        for statement in DEDUP_SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    from dedup import index_stored_rows
+    index_stored_rows(conn)
+
+
+DEDUP_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS minhash_signatures (
+        source TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        signature BLOB NOT NULL,
+        PRIMARY KEY (source, content_hash)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS lsh_buckets (
+        source TEXT NOT NULL,
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        content_hash TEXT NOT NULL,
+        PRIMARY KEY (source, band, bucket, content_hash)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS dedup_stats (
+        source TEXT PRIMARY KEY,
+        seen INTEGER NOT NULL,
+        exact_dups INTEGER NOT NULL,
+        near_dups INTEGER NOT NULL
+    ) WITHOUT ROWID
+'''
+
+MIGRATIONS.append(_add_content_hash)  # 3: content_hash + UNIQUE index, MinHash/LSH tables
+
+# 4: resume points of `backfill` jobs (see backfill.py), one row per job
+MIGRATIONS.append('''
+    CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+        job TEXT PRIMARY KEY,
+        input_format TEXT NOT NULL,
+        source TEXT NOT NULL,
+        byte_offset INTEGER NOT NULL,
+        input_size INTEGER NOT NULL,
+        records_read INTEGER NOT NULL,
+        rows_written INTEGER NOT NULL,
+        duplicates INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID;
+''')
+
+# 5: write counter bumped on every insert, update and delete of
+#    sentiment_data; the dashboard keys its caches on it (MAX(id) misses
+#    rescores and deletions)
+MIGRATIONS.append('''
+    CREATE TABLE IF NOT EXISTS sentiment_data_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO sentiment_data_version (id, version) VALUES (1, 0);
+
+    CREATE TRIGGER IF NOT EXISTS sentiment_version_insert
+    AFTER INSERT ON sentiment_data
+    BEGIN UPDATE sentiment_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS sentiment_version_delete
+    AFTER DELETE ON sentiment_data
+    BEGIN UPDATE sentiment_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS sentiment_version_update
+    AFTER UPDATE ON sentiment_data
+    BEGIN UPDATE sentiment_data_version SET version = version + 1 WHERE id = 1; END;
+''')
+
+
+def drop_stored_duplicates(conn, rows):
+    """
+    Drop rows whose (source, content_hash) is already stored or repeated
+    within `rows`.
+
+    Parameters:
+        rows (list): (source, content, label, score, content_hash) tuples.
+    """
+    by_source = {}
+    for row in rows:
+        by_source.setdefault(row[0], set()).add(row[4])
+    stored = set()
+    for source, hashes in by_source.items():
+        hashes = sorted(hashes)
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            stored.update(conn.execute(
+                f"SELECT source, content_hash FROM sentiment_data "
+                f"WHERE source = ? AND content_hash IN ({','.join('?' * len(chunk))})",
+                [source, *chunk]))
+    kept = []
+    for row in rows:
+        key = (row[0], row[4])
+        if key not in stored:
+            stored.add(key)
+            kept.append(row)
+    return kept
+
+
+def insert_sentiment_data(source, content, sentiment_label, sentiment_score, db_path=None):
+    """Insert one row; returns False if the same content is already stored for `source`."""
+    conn = get_connection(db_path)
+    with metrics.stage("db_insert"), conn:
+        cur = conn.execute(INSERT_SQL, (source, content, sentiment_label, sentiment_score,
+                                        content_hash(content)))
+        if cur.rowcount:
+            index_tokens(conn, [(source, content, sentiment_label)])
+    return bool(cur.rowcount)
+
+
+def write_rows(conn, rows, tokens=True, dedup=None):
+    """
+    Insert rows that are not stored yet, plus their token counts and
+    dedup index entries; the caller owns the transaction.
+
+    Parameters:
+        rows (list): (source, content, label, score, content_hash) tuples,
+            optionally followed by the cleaned text, which the token index
+            then uses instead of cleaning the content again.
+        tokens (bool): Update the token-frequency index.
+        dedup (dedup.Deduplicator): Index the rows for near-duplicate checks.
+
+    Returns:
+        list: The rows actually inserted.
+    """
+    kept = drop_stored_duplicates(conn, rows)
+    conn.executemany(INSERT_SQL, [row[:5] for row in kept])
+    if tokens:
+        index_tokens(conn, kept)
+    if dedup is not None:
+        dedup.persist(conn, kept)
+    return kept
+
+
+# ── Buffered writer ──────────────────────────────────────────────────────────
+_open_writers = set()
+
+
+class SentimentWriter:
+    """
+    Buffered writer for `sentiment_data`.
+
+    Rows are queued with `add()` and written with a single `executemany`
+    + commit whenever `batch_size` rows are pending or `flush_interval`
+    seconds have passed since the last flush (checked by a background
+    thread too, so rows are committed even when the input stalls; pass
+    flush_interval=None to flush only on size); the same transaction updates
+    the token-frequency index. Rows whose content is already stored for
+    the same source are skipped (counted in `duplicates_skipped`; the rows
+    actually stored are tallied per label in `label_counts`); with a
+    `dedup.Deduplicator`, the near-duplicate index and per-source dedup
+    stats are written in that transaction too. Use it as a context manager;
+    anything still pending is flushed on exit and at interpreter shutdown.
+
+        with SentimentWriter() as writer:
+            writer.add(source, text, label, score)
+    """
+
+    def __init__(self, db_path=None, batch_size=500, flush_interval=2.0, index_tokens=True,
+                 dedup=None):
+        self.db_path = db_path or DB_PATH
+        self.index_tokens = index_tokens
+        self.dedup = dedup
+        self.duplicates_skipped = 0
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.label_counts = Counter()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher = None
+        self._flush_error = None
+        self._closing = threading.Event()
+
+    def __enter__(self):
+        initialize_db(self.db_path)
+        _open_writers.add(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def add(self, source, content, sentiment_label, sentiment_score, cleaned=None):
+        """
+        Queue one row, flushing if the batch or time window is full.
+        `cleaned` is the scorer's cleaned text, reused for the token index.
+        """
+        self._raise_flush_error()
+        with self._lock:
+            self._pending.append((source, content, sentiment_label, sentiment_score, cleaned))
+            due = (len(self._pending) >= self.batch_size
+                   or (self.flush_interval is not None
+                       and time.monotonic() - self._last_flush >= self.flush_interval))
+            if self._flusher is None and self.flush_interval is not None:
+                self._flusher = threading.Thread(target=self._flush_periodically,
+                                                 name="sentiment-writer-flush", daemon=True)
+                self._flusher.start()
+        if due:
+            self.flush()
+
+    def add_many(self, rows):
+        """Queue an iterable of (source, content, label, score[, cleaned]) tuples."""
+        for row in rows:
+            self.add(*row)
+
+    def flush(self):
+        """Write all pending rows in one transaction. Returns the row count."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return 0
+            rows = [(source, content, label, score, content_hash(content), cleaned)
+                    for source, content, label, score, cleaned in rows]
+            conn = get_connection(self.db_path)
+            with metrics.stage("db_flush", items=len(rows)), conn:
+                kept = write_rows(conn, rows, self.index_tokens, self.dedup)
+            self.duplicates_skipped += len(rows) - len(kept)
+            metrics.observe("db_flush_rows", len(kept))
+            metrics.count("db_duplicates_skipped", len(rows) - len(kept))
+            self.rows_written += len(kept)
+            self.label_counts.update(row[2] for row in kept)
+            return len(kept)
+
+    def _flush_periodically(self):
+        # wake up when the time window of the pending rows ends; rows added
+        # after a longer idle gap are flushed by add() itself
+        try:
+            while True:
+                with self._lock:
+                    wait = self._last_flush + self.flush_interval - time.monotonic()
+                    due = wait <= 0 and bool(self._pending)
+                if due:
+                    self.flush()
+                elif self._closing.wait(wait if wait > 0 else self.flush_interval):
+                    return
+        except Exception as e:
+            self._flush_error = e  # re-raised in the caller's thread
+        finally:
+            release_connection(self.db_path)
+
+    def _raise_flush_error(self):
+        error, self._flush_error = self._flush_error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        self._closing.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self._closing.clear()
+        self._raise_flush_error()
+        self.flush()
+        if self.dedup is not None:
+            # stats of texts that were all duplicates (nothing left to flush)
+            conn = get_connection(self.db_path)
+            with conn:
+                self.dedup.persist(conn, [])
+        _open_writers.discard(self)
+
+
+@atexit.register
+def _flush_open_writers():
+    for writer in list(_open_writers):
+        writer.close()
+    close_connections()
+
+
+# ── Bulk read / update helpers ───────────────────────────────────────────────
+def iter_stored_rows(chunk_size=5000, db_path=None):
+    """
+    Yield lists of (id, day, source, content, sentiment_label) rows from
+    `sentiment_data` in id order, `chunk_size` rows at a time (keyset
+    pagination, so the table can be updated between chunks).
+    """
+    conn = get_connection(db_path)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, date(date_collected), source, content, sentiment_label "
+            "FROM sentiment_data WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk_size),
+        ).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+def update_sentiment_scores(rows, db_path=None, moved=()):
+    """
+    Overwrite label and score for existing rows.
+
+    Parameters:
+        rows (iterable): (sentiment_label, sentiment_score, id) tuples.
+        moved (iterable): (day, source, old_label, new_label, tokens) of
+            the rows whose label changed; their token counts move to the
+            new label in the same transaction (see `move_token_counts`).
+    """
+    conn = get_connection(db_path)
+    with conn:
+        conn.executemany(
+            "UPDATE sentiment_data SET sentiment_label = ?, sentiment_score = ? WHERE id = ?",
+            rows,
+        )
+        move_token_counts(conn, moved)
@@ -0,0 +1,240 @@
+"""
+dedup.py
+
+Ingestion-time deduplication, run before scoring and storage:
+
+- exact duplicates: `database.content_hash` of the normalised text,
+  backed by a UNIQUE (source, content_hash) index on `sentiment_data`
+- near duplicates (retweets with a different URL, headlines with an
+  extra word, ...): MinHash signatures over character 5-grams with an
+  LSH band index persisted in SQLite (`lsh_buckets`,
+  `minhash_signatures`), so each check is a handful of indexed lookups
+  regardless of how many rows are stored
+
+Checks are per source. Counts of seen / exact / near duplicates are kept
+per source and accumulated in the `dedup_stats` table.
+
+    dedup = Deduplicator()
+    with SentimentWriter(dedup=dedup) as writer:
+        for text in dedup.iter_unique(source, texts):
+            ...
+"""
+
+import zlib
+import sqlite3
+import hashlib
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from database import DB_PATH, content_hash, initialize_db
+from instrumentation import metrics
+
+NUM_PERM = 64
+BANDS = 16             # 16 bands of 4 rows: candidates from ~50% similarity
+SHINGLE_SIZE = 5       # characters
+DEFAULT_THRESHOLD = 0.8
+MAX_CANDIDATES = 50    # signatures compared per check, at most
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.RandomState(2024)
+_A = _rng.randint(1, 2**32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2**32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    """Character k-grams of the lowercased, whitespace-collapsed text."""
+    text = " ".join(text.lower().split())
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint64 values) of `text`."""
+    grams = shingles(text)
+    hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams),
+                         dtype=np.uint64, count=len(grams))
+    # (a*x + b) mod p stays below 2**64 because a, b, x < 2**32
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+
+def band_keys(signature):
+    """(band, bucket) pairs for the LSH index; bucket is a signed 64-bit hash."""
+    rows = NUM_PERM // BANDS
+    return [(band, int.from_bytes(
+                hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(),
+                                digest_size=8).digest(), 'little', signed=True))
+            for band in range(BANDS)]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _insert_signatures(conn, entries):
+    # entries: (source, content_hash, signature)
+    conn.executemany(
+        "INSERT OR IGNORE INTO minhash_signatures (source, content_hash, signature) VALUES (?, ?, ?)",
+        [(source, h, sig.tobytes()) for source, h, sig in entries])
+    conn.executemany(
+        "INSERT OR IGNORE INTO lsh_buckets (source, band, bucket, content_hash) VALUES (?, ?, ?, ?)",
+        [(source, band, bucket, h) for source, h, sig in entries for band, bucket in band_keys(sig)])
+
+
+def index_stored_rows(conn, chunk_size=5000):
+    """Add every stored row to the MinHash/LSH index (idempotent)."""
+    with conn:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, source, content, content_hash FROM sentiment_data "
+                "WHERE id > ? AND content_hash IS NOT NULL ORDER BY id LIMIT ?",
+                (last_id, chunk_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            _insert_signatures(conn, [(source, h, minhash(content)) for _, source, content, h in rows])
+
+
+class Deduplicator:
+    """
+    Parameters:
+        db_path (str): Database whose stored rows count as already seen.
+        threshold (float): Estimated Jaccard similarity at or above which
+            a text is a near duplicate.
+        near (bool): Also detect near duplicates (exact only if False).
+    """
+
+    def __init__(self, db_path=None, threshold=DEFAULT_THRESHOLD, near=True):
+        self.db_path = db_path
+        initialize_db(db_path)  # migration 3 creates the dedup tables
+        self.threshold = threshold
+        self.near = near
+        self.stats = defaultdict(Counter)
+        self._unsaved = defaultdict(Counter)
+        # accepted in this run but not stored yet: (source, hash) -> signature
+        self._pending = {}
+        self._pending_buckets = defaultdict(set)
+        self._lock = threading.Lock()
+        # lookups get their own connection: in streaming mode they run in the
+        # collector thread while the sink writes through the pooled one
+        self._conn = None
+
+    def _reader(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path or DB_PATH, check_same_thread=False)
+        return self._conn
+
+    def close(self):
+        """Close the lookup connection (reopened on the next check)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _stored(self, conn, source, h):
+        return conn.execute(
+            "SELECT 1 FROM sentiment_data WHERE source = ? AND content_hash = ?",
+            (source, h)).fetchone() is not None
+
+    def _near_match(self, conn, source, signature):
+        candidates = set()
+        for band, bucket in band_keys(signature):
+            candidates.update(self._pending_buckets.get((source, band, bucket), ()))
+            candidates.update(h for (h,) in conn.execute(
+                "SELECT content_hash FROM lsh_buckets WHERE source = ? AND band = ? AND bucket = ?",
+                (source, band, bucket)))
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+        if not candidates:
+            return False
+        candidates = sorted(candidates)[:MAX_CANDIDATES]
+        sigs = [self._pending[(source, h)] for h in candidates if (source, h) in self._pending]
+        stored = [h for h in candidates if (source, h) not in self._pending]
+        if stored:
+            sigs.extend(np.frombuffer(blob, dtype=np.uint64) for (blob,) in conn.execute(
+                f"SELECT signature FROM minhash_signatures WHERE source = ? "
+                f"AND content_hash IN ({','.join('?' * len(stored))})", [source, *stored]))
+        return any(similarity(signature, sig) >= self.threshold for sig in sigs)
+
+    def check(self, source, text):
+        """
+        Classify `text` against everything stored or accepted so far.
+
+        Returns:
+            str or None: 'exact', 'near', or None for a new text (which is
+            then remembered, so later copies in this run are caught too).
+        """
+        h = content_hash(text)
+        with metrics.stage("dedup"), self._lock:
+            conn = self._reader()
+            verdict = None
+            if (source, h) in self._pending or self._stored(conn, source, h):
+                verdict = "exact"
+            else:
+                signature = minhash(text) if self.near else None
+                if self.near and self._near_match(conn, source, signature):
+                    verdict = "near"
+                else:
+                    self._pending[(source, h)] = signature
+                    if self.near:
+                        for band, bucket in band_keys(signature):
+                            self._pending_buckets[(source, band, bucket)].add(h)
+            for counts in (self.stats[source], self._unsaved[source]):
+                counts["seen"] += 1
+                if verdict:
+                    counts[verdict] += 1
+            metrics.count(f"dedup_{verdict or 'new'}")
+            return verdict
+
+    def iter_unique(self, source, texts):
+        """Yield only the texts of `texts` that are neither exact nor near duplicates."""
+        for text in texts:
+            if self.check(source, text) is None:
+                yield text
+
+    def persist(self, conn, rows):
+        """
+        Index newly stored rows and save the stats counters; called by
+        `SentimentWriter.flush` inside its transaction.
+
+        Parameters:
+            rows (list): (source, content, label, score, content_hash[, cleaned]) tuples.
+        """
+        with self._lock:
+            entries = []
+            for source, content, _, _, h, *_ in rows:
+                signature = self._pending.pop((source, h), None)
+                if signature is None and self.near:
+                    signature = minhash(content)
+                if signature is not None:
+                    entries.append((source, h, signature))
+                    for band, bucket in band_keys(signature):
+                        key = (source, band, bucket)
+                        pending = self._pending_buckets.get(key)
+                        if pending is not None:
+                            pending.discard(h)
+                            if not pending:
+                                del self._pending_buckets[key]
+            if entries:
+                _insert_signatures(conn, entries)
+            conn.executemany('''
+                INSERT INTO dedup_stats (source, seen, exact_dups, near_dups) VALUES (?, ?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET seen = seen + excluded.seen,
+                    exact_dups = exact_dups + excluded.exact_dups,
+                    near_dups = near_dups + excluded.near_dups
+            ''', [(source, c["seen"], c["exact"], c["near"]) for source, c in self._unsaved.items()])
+            self._unsaved.clear()
+
+    def report(self):
+        """Per-source counts and rates for this run, as a dict of dicts."""
+        out = {}
+        for source, c in self.stats.items():
+            seen = c["seen"] or 1
+            out[source] = {"seen": c["seen"], "exact_dups": c["exact"], "near_dups": c["near"],
+                           "dup_rate": (c["exact"] + c["near"]) / seen}
+        return out
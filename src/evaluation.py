@@ -1,11 +1,79 @@
 # src/evaluation.py
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+import os
+import json
+import hashlib
+import datetime
+
+from lexicon import PIDGIN_LEXICON_PATH, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD, scoring_version
+
+# sklearn is imported inside evaluate(), so loading a cached result stays cheap
+EVAL_ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "artifacts")
+TEXT_LABELS = ['Negative', 'Neutral', 'Positive']
 
 def evaluate(y_true, y_pred, labels=None):
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+
     return {
         "accuracy": accuracy_score(y_true, y_pred),
         "precision": precision_score(y_true, y_pred, average='weighted', zero_division=0),
         "recall": recall_score(y_true, y_pred, average='weighted', zero_division=0),
         "f1": f1_score(y_true, y_pred, average='weighted', zero_division=0),
         "confusion_matrix": confusion_matrix(y_true, y_pred, labels=labels)
-    }
\ No newline at end of file
+    }
+
+
+# ── Cached text-evaluation artifacts ─────────────────────────────────────────
+def evaluation_key(labels_path, lexicon_path=PIDGIN_LEXICON_PATH):
+    """Hash of the labels file, the lexicon/NLTK version and the thresholds."""
+    digest = hashlib.sha256()
+    with open(labels_path, 'rb') as f:
+        digest.update(f.read())
+    digest.update(scoring_version(lexicon_path).encode('utf-8'))
+    digest.update(f"{POSITIVE_THRESHOLD}:{NEGATIVE_THRESHOLD}".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _artifact_path(key, artifact_dir=None):
+    return os.path.join(artifact_dir or EVAL_ARTIFACT_DIR, f"text_eval_{key}.json")
+
+
+def load_evaluation(labels_path, artifact_dir=None):
+    """
+    Return the stored metrics for `labels_path` if they match the current
+    inputs, else None. The confusion matrix comes back as a list of lists.
+    """
+    path = _artifact_path(evaluation_key(labels_path), artifact_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def evaluate_labels_file(labels_path, artifact_dir=None):
+    """
+    Score a text,gold_label CSV with the VADER pipeline, compute metrics,
+    and store them as a JSON artifact keyed by `evaluation_key`.
+    """
+    import pandas as pd
+    from sentiment_analysis import analyze_and_classify_batch
+
+    df = pd.read_csv(labels_path)
+    preds = analyze_and_classify_batch(df['text'])['label'].tolist()
+    m = evaluate(df['gold_label'].tolist(), preds, labels=TEXT_LABELS)
+
+    result = {
+        "key": evaluation_key(labels_path),
+        "labels_file": os.path.abspath(labels_path),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "labels": TEXT_LABELS,
+        "accuracy": float(m['accuracy']),
+        "precision": float(m['precision']),
+        "recall": float(m['recall']),
+        "f1": float(m['f1']),
+        "confusion_matrix": m['confusion_matrix'].tolist(),
+    }
+    path = _artifact_path(result['key'], artifact_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    return result
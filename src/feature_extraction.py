@@ -0,0 +1,78 @@
+"""
+feature_extraction.py
+
+Parallel, order-preserving extraction engine used by
+`data_preprocessing.preprocess_audio` / `preprocess_image`.
+
+- executor="process": CPU-bound work (librosa decode + MFCC)
+- executor="thread":  work that releases the GIL (cv2 decode/resize)
+
+Failures are collected per file instead of aborting the batch.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+
+def _call(func, path):
+    # runs in the worker; exceptions come back as values so one bad file
+    # never cancels the rest of the batch
+    try:
+        return True, func(path)
+    except Exception as e:
+        return False, e
+
+
+def print_progress(label):
+    """Progress callback printing roughly every 5% (and at the end)."""
+    def report(done, total):
+        step = max(1, total // 20)
+        if done == total or done % step == 0:
+            print(f"\r{label}: {done}/{total}", end="\n" if done == total else "", file=sys.stderr)
+    return report
+
+
+def extract_parallel(func, paths, workers=None, executor="process", progress=None):
+    """
+    Apply `func` to every path, in parallel, keeping input order.
+
+    Parameters:
+        func (callable): Picklable (module-level or functools.partial) for
+            the process executor.
+        paths (list): Input file paths.
+        workers (int): Pool size (default: CPU count); 1 runs inline.
+        executor (str): "process" or "thread".
+        progress (callable): Optional callback(done, total).
+
+    Returns:
+        tuple: (results, failures) where `results[i]` is func(paths[i]) or
+        None if it failed, and `failures` is a list of
+        (index, path, exception) in index order.
+    """
+    paths = list(paths)
+    total = len(paths)
+    results = [None] * total
+    failures = []
+
+    def record(i, ok, value, done):
+        if ok:
+            results[i] = value
+        else:
+            failures.append((i, paths[i], value))
+        if progress is not None:
+            progress(done, total)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or total <= 1:
+        for i, path in enumerate(paths):
+            record(i, *_call(func, path), i + 1)
+        return results, failures
+
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_cls(max_workers=min(workers, total)) as pool:
+        futures = {pool.submit(_call, func, path): i for i, path in enumerate(paths)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            record(futures[future], *future.result(), done)
+    failures.sort(key=lambda f: f[0])
+    return results, failures
@@ -0,0 +1,80 @@
+"""
+feature_store.py
+
+Content-addressed on-disk cache for per-file features (MFCC means,
+resized images). Entries are keyed by the file's absolute path, size and
+mtime (or, optionally, a hash of its bytes) plus the preprocessing
+parameters, stored as .npy files and read back memory-mapped, so repeated
+runs over the same dataset skip decoding entirely.
+
+    store = FeatureStore()
+    feats = preprocess_audio(paths, store=store)
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+DEFAULT_FEATURE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "features")
+
+
+class FeatureStore:
+    """
+    Parameters:
+        root (str): Directory holding the cached arrays.
+        content_hash (bool): Key on a SHA-1 of the file bytes instead of
+            size + mtime (robust to touched/copied files, slower).
+    """
+
+    def __init__(self, root=DEFAULT_FEATURE_DIR, content_hash=False):
+        self.root = root
+        self.content_hash = content_hash
+        self.hits = 0
+        self.misses = 0
+
+    def _file_id(self, path):
+        st = os.stat(path)
+        if not self.content_hash:
+            return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def key(self, kind, path, params):
+        payload = json.dumps([kind, self._file_id(path), params], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, kind, key):
+        return os.path.join(self.root, kind, key[:2], f"{key}.npy")
+
+    def get(self, kind, path, params):
+        """Memory-mapped cached array, or None (also None for unreadable files)."""
+        try:
+            cached = self._path(kind, self.key(kind, path, params))
+        except OSError:
+            return None
+        if not os.path.exists(cached):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return np.load(cached, mmap_mode='r')
+
+    def put(self, kind, path, params, array):
+        cached = self._path(kind, self.key(kind, path, params))
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.asarray(array))
+        os.replace(tmp, cached)
+
+    def get_or_compute(self, kind, path, params, compute):
+        """Return the cached array for `path`, computing and storing it on a miss."""
+        cached = self.get(kind, path, params)
+        if cached is not None:
+            return cached
+        array = compute(path)
+        self.put(kind, path, params, array)
+        return array
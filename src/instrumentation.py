@@ -0,0 +1,245 @@
+"""
+instrumentation.py
+
+Lightweight hot-path instrumentation for the live / eval pipelines:
+per-stage timers (items/sec, p50/p95/p99 latency), counters, observed values
+(e.g. DB flush sizes) and gauges (e.g. score-cache stats), written as a
+JSON or CSV report at the end of a run.
+
+Everything is off until `metrics.enable()`; a disabled timer is a shared
+no-op context manager, so the calls can stay in the hot path.
+
+    from instrumentation import metrics
+    with metrics.stage("score"):
+        ...
+    metrics.count("texts_collected")
+    metrics.observe("db_flush_rows", len(rows))
+
+`profiled()` wraps a single run in cProfile (or pyinstrument, if installed).
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import datetime
+import threading
+from contextlib import contextmanager, nullcontext
+
+METRICS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "metrics")
+MAX_SAMPLES = 100_000  # latency samples kept per stage (reservoir beyond that)
+
+_NULL = nullcontext()
+
+
+def _percentile(sorted_values, q):
+    # nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "items", "start")
+
+    def __init__(self, metrics, name, items):
+        self.metrics, self.name, self.items = metrics, name, items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start, self.items)
+        return False
+
+
+class Metrics:
+    """Process-wide registry of stage timings, counters and observations."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        if enabled and self._started is None:
+            self._started = time.time()
+
+    def reset(self):
+        with self._lock:
+            self._started = time.time() if self.enabled else None
+            self._stages = {}        # name -> [calls, items, total_s, samples]
+            self._counters = {}
+            self._observations = {}  # name -> [count, sum, max]
+            self._gauges = {}
+
+    # ── recording ────────────────────────────────────────────────────────────
+    def stage(self, name, items=1):
+        """Context manager timing one call of stage `name` covering `items` items."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, name, items)
+
+    def add_time(self, name, seconds, items=1):
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                entry = self._stages[name] = [0, 0, 0.0, []]
+            entry[0] += 1
+            entry[1] += items
+            entry[2] += seconds
+            samples = entry[3]
+            if len(samples) < MAX_SAMPLES:
+                samples.append(seconds)
+            else:
+                slot = random.randrange(entry[0])
+                if slot < MAX_SAMPLES:
+                    samples[slot] = seconds
+
+    def timed_iter(self, name, iterable):
+        """Yield from `iterable`, timing each `next()` as one item of stage `name`."""
+        if not self.enabled:
+            yield from iterable
+            return
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        if self.enabled:
+            with self._lock:
+                entry = self._observations.setdefault(name, [0, 0.0, value])
+                entry[0] += 1
+                entry[1] += value
+                entry[2] = max(entry[2], value)
+
+    def gauge(self, name, value):
+        if self.enabled:
+            with self._lock:
+                self._gauges[name] = value
+
+    # ── reporting ────────────────────────────────────────────────────────────
+    def report(self, **run_info):
+        """
+        Snapshot of everything recorded so far.
+
+        Returns:
+            dict: run, stages (count, items, total_s, items_per_s, p50_ms,
+            p95_ms, p99_ms, max_ms), counters, observations (count, mean,
+            max), gauges.
+        """
+        with self._lock:
+            stages = {}
+            for name, (calls, items, total, samples) in self._stages.items():
+                ordered = sorted(samples)
+                stages[name] = {
+                    "count": calls,
+                    "items": items,
+                    "total_s": round(total, 6),
+                    "items_per_s": round(items / total, 2) if total else None,
+                    "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+                    "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+                    "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+                    "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+                }
+            observations = {name: {"count": n, "mean": total / n, "max": peak}
+                            for name, (n, total, peak) in self._observations.items()}
+            started = self._started or time.time()
+            return {
+                "run": {"started": datetime.datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+                        "wall_s": round(time.time() - started, 3), **run_info},
+                "stages": stages,
+                "counters": dict(self._counters),
+                "observations": observations,
+                "gauges": dict(self._gauges),
+            }
+
+    def write_report(self, path=None, **run_info):
+        """
+        Write the report as JSON, or as CSV (kind,name,metric,value rows)
+        when `path` ends in .csv. Default: data/metrics/<timestamp>.json.
+        Returns the path written.
+        """
+        report = self.report(**run_info)
+        if path is None:
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(METRICS_DIR, f"{run_info.get('mode', 'run')}_{stamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path.endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["kind", "name", "metric", "value"])
+                for kind, entries in report.items():
+                    for name, value in entries.items():
+                        if isinstance(value, dict):
+                            for metric, v in value.items():
+                                writer.writerow([kind, name, metric, v])
+                        else:
+                            writer.writerow([kind, name, "", value])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, default=str)
+        return path
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def profiled(path, tool="cprofile"):
+    """
+    Profile the enclosed block.
+
+    Parameters:
+        path (str): Output file: cProfile stats (view with `python -m pstats`
+            or snakeviz), or pyinstrument HTML/text (.html -> HTML).
+        tool (str): "cprofile" or "pyinstrument" (falls back to cProfile
+            when pyinstrument is not installed).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if tool == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument is not installed; using cProfile", file=sys.stderr)
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html() if path.endswith(".html") else profiler.output_text())
+                print(f"Profile written to {path}", file=sys.stderr)
+            return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+        print(f"Profile written to {path}", file=sys.stderr)
@@ -0,0 +1,68 @@
+"""
+lexicon.py
+
+Location, loading and versioning of the custom Pidgin sentiment lexicon
+that is merged into VADER by `sentiment_analysis`, plus the label
+thresholds applied to VADER's compound score.
+"""
+
+import os
+import csv
+import hashlib
+from importlib import metadata
+
+PIDGIN_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "pidgin_lexicon.csv")
+
+# Label thresholds on the VADER compound score. Kept here (not in
+# sentiment_analysis) so light modules such as the dashboard can fingerprint
+# the scoring configuration without importing NLTK.
+POSITIVE_THRESHOLD = 0.10
+NEGATIVE_THRESHOLD = -0.10
+
+# Bumped whenever the scoring algorithm itself changes (e.g. multi-word
+# Pidgin phrases being merged before scoring), so cached scores and
+# evaluation artifacts from the old algorithm are discarded.
+SCORER_VERSION = "phrases-1"
+
+
+def load_pidgin_lexicon(path=PIDGIN_LEXICON_PATH):
+    """
+    Read the Pidgin lexicon CSV.
+
+    Parameters:
+        path (str): CSV file with columns word,sentiment_score.
+
+    Returns:
+        dict: word -> sentiment score (float).
+    """
+    lexicon = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            lexicon[row['word']] = float(row['sentiment_score'])
+    return lexicon
+
+
+def lexicon_version(path=PIDGIN_LEXICON_PATH, *extra):
+    """
+    Short content hash of the lexicon file (plus any `extra` strings, e.g.
+    library versions). Changes whenever the lexicon is edited.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+    for item in extra:
+        digest.update(str(item).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def scoring_version(path=PIDGIN_LEXICON_PATH):
+    """
+    Version of everything that determines VADER scores: the Pidgin lexicon,
+    the installed NLTK (which ships the base VADER lexicon) and the scorer.
+    """
+    try:
+        nltk_version = metadata.version('nltk')
+    except metadata.PackageNotFoundError:
+        nltk_version = 'unknown'
+    return lexicon_version(path, nltk_version, SCORER_VERSION)
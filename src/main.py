@@ -13,30 +13,27 @@ Extended to support multimodal dataset training & evaluation (text, audio, image
 import sys
 import os
 import argparse
+from contextlib import contextmanager, nullcontext
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
 
 # ensure project root in path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Existing imports from your modules
+# Text-path imports only; data collection, plotting and the multimodal stack
+# (sklearn models, librosa, cv2, transformers) are imported where they are used
+# so `eval` and `live` start fast.
 try:
-    from data_collection import collect_tweets, scrape_web_page, fetch_news
-    from sentiment_analysis import analyze_and_classify
-    from database import initialize_db, insert_sentiment_data  # <- ADDED explicitly here ✅
+    from sentiment_analysis import analyze_and_classify, score_cache
+    from database import SentimentWriter
+    from instrumentation import metrics, profiled
 except ImportError:
-    from src.data_collection import collect_tweets, scrape_web_page, fetch_news
-    from src.sentiment_analysis import analyze_and_classify
-    from src.database import initialize_db, insert_sentiment_data  # <- ADDED explicitly here ✅
+    from src.sentiment_analysis import analyze_and_classify, score_cache
+    from src.database import SentimentWriter
+    from src.instrumentation import metrics, profiled
 
-# New multimodal imports
-from data_preprocessing import preprocess_text, preprocess_audio, preprocess_image
-from models.text_model import TextModel
-from models.audio_model import AudioModel
-from models.image_model import ImageModel
-from models.multimodal_fusion import MultimodalFusion
-from evaluation import evaluate
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "data", "models", "multimodal")
 
 
 def load_dataset(csv_path):
@@ -47,41 +44,92 @@ def load_dataset(csv_path):
     return df['text'].tolist(), df['audio_path'].tolist(), df['image_path'].tolist(), df['label'].tolist()
 
 
-def live_pipeline(source, query):
-    """Run the existing VADER-based live pipeline."""
-    # Collect data based on chosen source
-    if source == "twitter":
-        texts = collect_tweets(query=query)
-    elif source == "web":
-        texts = scrape_web_page(query)
-    else:  # news
-        articles = fetch_news(query=query)
-        texts = [f"{a.get('title','')} {a.get('description','')}".strip() for a in articles]
+def preload_vocabulary():
+    """Warm the lemma table with the stored corpus vocabulary before scoring."""
+    from data_preprocessing import preload_lemmas
+    from database import corpus_vocabulary
 
-    if not texts:
-        print("No data collected for live pipeline.")
-        sys.exit(1)
+    with metrics.stage("preload_lemmas"):
+        size = preload_lemmas(corpus_vocabulary())
+    if size:
+        print(f"Preloaded {size} lemmas from the corpus vocabulary")
 
-    # Initialize DB
-    initialize_db()
 
+def live_pipeline(source, query, stream=False, dedup=True):
+    """
+    Run the existing VADER-based live pipeline.
+
+    For the web source `query` may be a list of URLs; they are crawled
+    concurrently and scored as each page arrives. With `stream=True` texts
+    flow through the micro-batched streaming pipeline instead (see
+    streaming.py) and only per-label counts are kept in memory. Texts that
+    are exact or near duplicates of stored rows are dropped before scoring
+    (`dedup=False` keeps near duplicates; exact copies are never stored).
+    """
+    from streaming import iter_source_texts
+    from data_preprocessing import clean_text_for_vader
+    from dedup import Deduplicator
+
+    deduplicator = Deduplicator() if dedup else None
+    if stream:
+        from streaming import run_streaming
+        texts = metrics.timed_iter("collect", iter_source_texts(source, query))
+        counts = run_streaming(source, texts,
+                               on_batch=lambda b: print(f"Stored {len(b)} rows"),
+                               dedup=deduplicator)
+        print_dedup_report(deduplicator)
+        if not counts:
+            print("No new data collected for live pipeline.")
+            sys.exit(1)
+        dist = pd.Series(counts).sort_values(ascending=False)
+        print("\nSentiment counts:")
+        print(dist)
+        plot_distribution(dist)
+        return
+
+    # Collect data from the chosen source; rows are buffered and written in batches
     results = []
-    for text in texts:
-        scores, label = analyze_and_classify(text)
-        # debug: show raw vs cleaned vs scores
-        from data_preprocessing import clean_text_for_vader
-        print("RAW:    ", text)
-        print("CLEAN:  ", clean_text_for_vader(text))
-        print("SCORES: ", scores, "→", label)
-        print("-" * 40)
-        insert_sentiment_data(source, text, label, scores['compound'])
-        results.append({"text": text, "compound": scores['compound'], "label": label})
+    with SentimentWriter(dedup=deduplicator) as writer:
+        texts = metrics.timed_iter("collect", iter_source_texts(source, query))
+        if deduplicator is not None:
+            texts = deduplicator.iter_unique(source, texts)
+        for text in texts:
+            scores, label = analyze_and_classify(text)
+            cleaned = clean_text_for_vader(text)
+            # debug: show raw vs cleaned vs scores
+            print("RAW:    ", text)
+            print("CLEAN:  ", cleaned)
+            print("SCORES: ", scores, "→", label)
+            print("-" * 40)
+            writer.add(source, text, label, scores['compound'], cleaned)
+            results.append({"text": text, "compound": scores['compound'], "label": label})
+    print_dedup_report(deduplicator)
+
+    if not results:
+        print("No new data collected for live pipeline.")
+        sys.exit(1)
 
     df = pd.DataFrame(results)
     print("\nSentiment Analysis Results (first 5 rows):")
     print(df.head())
 
-    dist = df['label'].value_counts()
+    plot_distribution(df['label'].value_counts())
+
+
+def print_dedup_report(deduplicator):
+    """Per-source duplicate counts for this run (the deduplicator is closed)."""
+    if deduplicator is None:
+        return
+    deduplicator.close()
+    for source, r in deduplicator.report().items():
+        print(f"\nDedup [{source}]: {r['seen']} seen, {r['exact_dups']} exact, "
+              f"{r['near_dups']} near duplicates ({r['dup_rate']:.1%} dropped)")
+
+
+def plot_distribution(dist):
+    """Bar chart of sentiment label counts."""
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8,6))
     dist.plot(kind='bar')
     plt.title('Sentiment Distribution (Live Data)')
@@ -91,27 +139,53 @@ def live_pipeline(source, query):
     plt.show()
 
 
-def multimodal_pipeline(dataset, test_size):
-    """Run multimodal training & evaluation on labeled CSV dataset."""
+@contextmanager
+def embedding_cache(pipeline):
+    """Load / save the BERT embedding cache around a multimodal run."""
+    bert = getattr(pipeline.text_model, "bert", None)
+    if bert is not None:
+        bert.load_cache()
+    try:
+        yield
+    finally:
+        if bert is not None:
+            bert.save_cache()
+
+
+def multimodal_pipeline(dataset, test_size, model_dir=None, feature_cache=True, workers=1,
+                        image_pca="full", fusion="early", text_encoder="tfidf",
+                        text_options=None):
+    """
+    Run multimodal training & evaluation on labeled CSV dataset.
+    The fitted encoders and fusion classifier are saved to `model_dir`.
+    """
+    from sklearn.model_selection import train_test_split
+    from models.pipeline import MultimodalPipeline
+    from feature_store import FeatureStore
+    from evaluation import evaluate
+
     texts, aud_paths, img_paths, labels = load_dataset(dataset)
     txt_tr, txt_te, aud_tr, aud_te, img_tr, img_te, y_tr, y_te = train_test_split(
         texts, aud_paths, img_paths, labels,
         test_size=test_size, random_state=42, stratify=labels
     )
 
-    # preprocess and encode
-    txt_feats_tr = TextModel().encode(preprocess_text(txt_tr))
-    aud_feats_tr = preprocess_audio(aud_tr)
-    img_feats_tr = ImageModel().encode(preprocess_image(img_tr))
-
-    txt_feats_te = TextModel().encode(preprocess_text(txt_te))
-    aud_feats_te = preprocess_audio(aud_te)
-    img_feats_te = ImageModel().encode(preprocess_image(img_te))
-
-    # train fusion model
-    fusion = MultimodalFusion()
-    fusion.fit(txt_feats_tr, aud_feats_tr, img_feats_tr, y_tr)
-    y_pred = fusion.predict(txt_feats_te, aud_feats_te, img_feats_te)
+    # fit encoders (TF-IDF, image PCA) and fusion model on the train split only
+    store = FeatureStore() if feature_cache else None
+    pipeline = MultimodalPipeline(feature_store=store, workers=workers, progress=True,
+                                  image_mode=image_pca, fusion=fusion,
+                                  text_encoder=text_encoder, text_options=text_options)
+    with embedding_cache(pipeline):
+        pipeline.fit(txt_tr, aud_tr, img_tr, y_tr)
+        y_pred = pipeline.predict(txt_te, aud_te, img_te)
+    # test rows with unreadable audio/images get no prediction
+    scored = [i for i, p in enumerate(y_pred) if p is not None]
+    y_te, y_pred = [y_te[i] for i in scored], list(y_pred[scored])
+
+    if model_dir:
+        pipeline.save(model_dir, metadata={"dataset": os.path.abspath(dataset),
+                                           "labels": sorted(set(labels))})
+        print(f"Saved fitted models to {model_dir}")
 
     # evaluate
     metrics = evaluate(y_te, y_pred, labels=list(sorted(set(labels))))
@@ -124,54 +198,203 @@ def multimodal_pipeline(dataset, test_size):
     print(metrics['confusion_matrix'])
 
 
+def predict_pipeline(model_dir, dataset, output=None, feature_cache=True, workers=1):
+    """Score a CSV (text,audio_path,image_path) with saved multimodal models."""
+    from models.pipeline import MultimodalPipeline
+    from feature_store import FeatureStore
+
+    pipeline = MultimodalPipeline.load(model_dir, FeatureStore() if feature_cache else None,
+                                       workers=workers, progress=True)
+    df = pd.read_csv(dataset)
+    with embedding_cache(pipeline):
+        df['prediction'] = pipeline.predict(df['text'].tolist(), df['audio_path'].tolist(),
+                                            df['image_path'].tolist())
+    if output:
+        df.to_csv(output, index=False)
+        print(f"Wrote {len(df)} predictions to {output}")
+    else:
+        print(df[['text', 'prediction']])
+
+
+def run(args):
+    """Dispatch a parsed command line to its pipeline."""
+    if args.mode == 'live':
+        # Use exactly what the user passed in as the query
+        query = args.query if args.source == 'web' else " ".join(args.query)
+        print(f"\n>>> Fetching sentiment for {' '.join(args.query)}")
+        preload_vocabulary()
+        live_pipeline(args.source, query, stream=args.stream, dedup=not args.no_dedup)
+    elif args.mode == 'multimodal':
+        multimodal_pipeline(args.dataset, args.test_size, args.model_dir,
+                            feature_cache=not args.no_feature_cache,
+                            workers=args.workers or None, image_pca=args.image_pca,
+                            fusion=args.fusion, text_encoder=args.text_encoder,
+                            text_options={"num_threads": args.bert_threads,
+                                          "quantize": args.bert_quantize}
+                            if args.text_encoder == 'bert' else None)
+    elif args.mode == 'predict':
+        predict_pipeline(args.model_dir, args.dataset, args.output,
+                         feature_cache=not args.no_feature_cache,
+                         workers=args.workers or None)
+    elif args.mode == 'backfill':
+        from backfill import run_backfill
+        from dedup import Deduplicator
+        deduplicator = None if args.no_dedup else Deduplicator()
+        try:
+            cp = run_backfill(args.source, args.input, args.format, job=args.job,
+                              chunk_size=args.chunk_size, text_field=args.text_field,
+                              workers=args.workers, restart=args.restart, dedup=deduplicator)
+        except KeyboardInterrupt:
+            sys.exit(130)
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+        print(f"\nBackfill complete: {cp['records_read']} records, {cp['rows_written']} rows written, "
+              f"{cp['duplicates']} duplicates skipped.")
+    elif args.mode == 'export-parquet':
+        from parquet_export import export_parquet
+        state = export_parquet(args.out, full=args.full, chunk_size=args.chunk_size,
+                               compression=args.compression)
+        print(f"\nParquet export: {state['rows']} rows up to id {state['max_id']} in {args.out}")
+    elif args.mode == 'serve':
+        from service import serve
+        serve(args.host, args.port, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    elif args.mode == 'rescore':
+        from parallel_scoring import rescore_database
+        total = rescore_database(workers=args.workers, chunk_size=args.chunk_size)
+        print(f"\nRe-scored {total} rows in sentiment_data.")
+    else:  # args.mode == 'eval'
+        # Score the gold-labelled CSV and store the metrics as an artifact
+        # (the dashboard loads it instead of re-scoring)
+        from evaluation import evaluate_labels_file
+        preload_vocabulary()
+        m = evaluate_labels_file(args.labels)
+        print("\nEvaluation on gold-labeled text:")
+        print(f"Accuracy : {m['accuracy']:.4f}")
+        print(f"Precision: {m['precision']:.4f}")
+        print(f"Recall   : {m['recall']:.4f}")
+        print(f"F1 Score : {m['f1']:.4f}")
+        print("\nConfusion Matrix:")
+        print(pd.DataFrame(m['confusion_matrix'], index=m['labels'], columns=m['labels']))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Opinion Mining System: live VADER or multimodal dataset")
+    parser.add_argument('--metrics-out', nargs='?', const='', default=None, metavar='PATH',
+                        help="Record stage timings/counters and write a JSON (or .csv) report "
+                             "(default path: data/metrics/<mode>_<time>.json)")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Profile the run and write the result to PATH")
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile',
+                        help="Profiler used by --profile")
     subparsers = parser.add_subparsers(dest='mode', required=True)
 
     # live subcommand
     p_live = subparsers.add_parser('live', help='Run live VADER sentiment on twitter/web/news')
     p_live.add_argument('source', choices=['twitter','web','news'], help="Data source for live mode")
-    p_live.add_argument('query', help="Query (for twitter/news) or URL (for web)")
+    p_live.add_argument('query', nargs='+',
+                        help="Query (for twitter/news) or one or more URLs (for web)")
+    p_live.add_argument('--stream', action='store_true',
+                        help="Score in micro-batches and write to SQLite as items arrive")
+    p_live.add_argument('--no-dedup', action='store_true',
+                        help="Keep near duplicates (exact duplicates are still skipped)")
 
     # multimodal subcommand
     p_mm = subparsers.add_parser('multimodal', help='Run multimodal training & evaluation')
     p_mm.add_argument('--dataset', required=True, help="CSV: text,audio_path,image_path,label")
     p_mm.add_argument('--test-size', type=float, default=0.2, help="Test split proportion")
+    p_mm.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Where to save the fitted models")
+    p_mm.add_argument('--no-feature-cache', action='store_true',
+                      help="Always decode audio/images instead of using data/features")
+    p_mm.add_argument('--workers', type=int, default=1,
+                      help="Parallel audio/image decoders (0 = CPU count)")
+    p_mm.add_argument('--image-pca', choices=['full', 'incremental'], default='full',
+                      help="'incremental' fits the image PCA in mini-batches (bounded memory)")
+    p_mm.add_argument('--text-encoder', choices=['tfidf', 'bert'], default='tfidf',
+                      help="Text features: TF-IDF or CPU BERT embeddings")
+    p_mm.add_argument('--bert-threads', type=int, default=None, help="torch threads for BERT")
+    p_mm.add_argument('--bert-quantize', action='store_true',
+                      help="Dynamic int8 quantization of the BERT encoder")
+    p_mm.add_argument('--fusion', choices=['early', 'late'], default='early',
+                      help="'early': one classifier on sparse stacked features; "
+                           "'late': per-modality classifiers, probabilities averaged")
+
+    # predict subcommand: score new data with saved multimodal models
+    p_pred = subparsers.add_parser('predict', help='Predict with saved multimodal models (no retraining)')
+    p_pred.add_argument('--dataset', required=True, help="CSV: text,audio_path,image_path")
+    p_pred.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directory written by 'multimodal'")
+    p_pred.add_argument('--output', help="Optional CSV to write predictions to")
+    p_pred.add_argument('--no-feature-cache', action='store_true',
+                        help="Always decode audio/images instead of using data/features")
+    p_pred.add_argument('--workers', type=int, default=1,
+                        help="Parallel audio/image decoders (0 = CPU count)")
 
     # eval subcommand for text-only VADER evaluation
     p_eval = subparsers.add_parser('eval', help='Evaluate text pipeline against labeled CSV')
     p_eval.add_argument('--labels', required=True, 
                         help="CSV file with columns: text,gold_label (Positive/Neutral/Negative)")
 
+    # backfill subcommand: resumable, checkpointed ingestion of archived dumps
+    p_back = subparsers.add_parser('backfill', help='Score and store a JSONL/CSV dump or URL list (resumable)')
+    p_back.add_argument('source', choices=['twitter','web','news'], help="Value for the source column")
+    p_back.add_argument('input', help="JSONL or CSV file of posts, or a text file with one URL per line")
+    p_back.add_argument('--format', choices=['jsonl', 'csv', 'urls'],
+                        help="Input format (default: from the file extension)")
+    p_back.add_argument('--text-field', help="JSON key / CSV column with the text (default: text, "
+                                             "full_text, content, body, description or title)")
+    p_back.add_argument('--chunk-size', type=int, default=2000,
+                        help="Records per transaction (and per checkpoint)")
+    p_back.add_argument('--workers', type=int, default=1, help="Scoring processes")
+    p_back.add_argument('--job', help="Checkpoint name (default: the input's absolute path)")
+    p_back.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start over")
+    p_back.add_argument('--no-dedup', action='store_true',
+                        help="Keep near duplicates (exact duplicates are still skipped)")
+
+    # export-parquet subcommand: columnar copy for historical analytics
+    from parquet_export import PARQUET_DIR
+    p_pq = subparsers.add_parser('export-parquet',
+                                 help='Append new rows to the date/source-partitioned Parquet export')
+    p_pq.add_argument('--out', default=PARQUET_DIR, help="Dataset directory")
+    p_pq.add_argument('--full', action='store_true',
+                      help="Rebuild the export (picks up rows changed by rescore)")
+    p_pq.add_argument('--chunk-size', type=int, default=250_000, help="Rows read from SQLite per step")
+    p_pq.add_argument('--compression', default='zstd', help="Parquet codec (zstd, snappy, gzip, ...)")
+
+    # serve subcommand: long-running HTTP scoring service
+    p_serve = subparsers.add_parser('serve', help='HTTP scoring service (/score, /score_batch, /stats)')
+    p_serve.add_argument('--host', default='127.0.0.1', help="Interface to bind")
+    p_serve.add_argument('--port', type=int, default=8000, help="Port to listen on")
+    p_serve.add_argument('--max-batch', type=int, default=64, help="Texts per micro-batch, at most")
+    p_serve.add_argument('--max-wait-ms', type=float, default=0.0,
+                         help="How long a request waits for others to join its micro-batch "
+                              "(0: score what is queued now; later requests form the next batch)")
+
+    # rescore subcommand: parallel re-scoring of the stored corpus
+    p_rescore = subparsers.add_parser('rescore', help='Re-score every stored row in parallel')
+    p_rescore.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    p_rescore.add_argument('--chunk-size', type=int, default=2000, help="Texts per worker task")
+
     args = parser.parse_args()
-    if args.mode == 'live':
-        # Use exactly what the user passed in as the query
-        print(f"\n>>> Fetching sentiment for {args.query}")
-        live_pipeline(args.source, args.query)
-    elif args.mode == 'multimodal':
-         multimodal_pipeline(args.dataset, args.test_size)
-    else:  # args.mode == 'eval'
-        # Load gold-labels
-        df = pd.read_csv(args.labels)
-        texts = df['text'].tolist()
-        gold = df['gold_label'].tolist()
-
-        # Run VADER pipeline on each
-        preds = []
-        for t in texts:
-            _, label = analyze_and_classify(t)
-            preds.append(label)
-
-        # Compute metrics
-        from evaluation import evaluate
-        m = evaluate(gold, preds, labels=['Negative','Neutral','Positive'])
-        print("\nEvaluation on gold-labeled text:")
-        print(f"Accuracy : {m['accuracy']:.4f}")
-        print(f"Precision: {m['precision']:.4f}")
-        print(f"Recall   : {m['recall']:.4f}")
-        print(f"F1 Score : {m['f1']:.4f}")
-        print("\nConfusion Matrix:")
-        print(m['confusion_matrix'])
+
+    if args.metrics_out is not None:
+        metrics.enable()
+    profile = profiled(args.profile, args.profiler) if args.profile else nullcontext()
+
+    # Warm-start the score cache for the VADER text paths
+    use_cache = args.mode in ('live', 'eval')
+    if use_cache:
+        score_cache.load()
+    try:
+        with profile:
+            run(args)
+    finally:
+        if use_cache:
+            score_cache.save()
+            print(f"\nScore cache: {score_cache.stats()}")
+        if metrics.enabled:
+            metrics.gauge("score_cache", score_cache.stats())
+            path = metrics.write_report(args.metrics_out or None, mode=args.mode)
+            print(f"Metrics report written to {path}")
 
 
 if __name__ == "__main__":
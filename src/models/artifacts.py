@@ -0,0 +1,85 @@
+# src/models/artifacts.py
+"""
+Versioned, checksummed storage for fitted model objects.
+
+A model directory holds one joblib file per component plus a
+`manifest.json` recording the format version, library versions and the
+SHA-256 of every file. Checksums are verified before anything is
+unpickled.
+"""
+import os
+import json
+import hashlib
+import datetime
+import warnings
+
+import joblib
+import sklearn
+
+FORMAT_VERSION = 2  # 2: image PCA modes, sparse/late fusion, BERT text encoder
+MANIFEST = "manifest.json"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_artifacts(model_dir, components, metadata=None):
+    """
+    Save `components` (name -> fitted object) into `model_dir`.
+
+    Returns:
+        dict: The manifest that was written.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "sklearn_version": sklearn.__version__,
+        "metadata": metadata or {},
+        "components": {},
+    }
+    for name, obj in components.items():
+        filename = f"{name}.joblib"
+        path = os.path.join(model_dir, filename)
+        joblib.dump(obj, path)
+        manifest["components"][name] = {
+            "file": filename,
+            "class": f"{type(obj).__module__}.{type(obj).__name__}",
+            "sha256": _sha256(path),
+        }
+    with open(os.path.join(model_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_artifacts(model_dir):
+    """
+    Load every component saved by `save_artifacts`.
+
+    Returns:
+        tuple: (components dict, manifest dict)
+
+    Raises:
+        ValueError: unknown format version or checksum mismatch.
+    """
+    with open(os.path.join(model_dir, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format {manifest.get('format_version')} in {model_dir} "
+                         f"(expected {FORMAT_VERSION}); retrain with `main.py multimodal`")
+    if manifest.get("sklearn_version") != sklearn.__version__:
+        warnings.warn(f"Models in {model_dir} were saved with scikit-learn "
+                      f"{manifest.get('sklearn_version')}, running {sklearn.__version__}")
+
+    components = {}
+    for name, entry in manifest["components"].items():
+        path = os.path.join(model_dir, entry["file"])
+        if _sha256(path) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for {path}; refusing to load")
+        components[name] = joblib.load(path)
+    return components, manifest
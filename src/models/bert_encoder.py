@@ -0,0 +1,128 @@
+# src/models/bert_encoder.py
+"""
+CPU transformer text encoder producing one fixed-size embedding per text.
+
+- fast (Rust) tokenizer, texts tokenized once without padding
+- length-bucketed mini-batches: texts are sorted by token count so each
+  batch is padded only to its own longest member
+- torch.inference_mode, configurable intra-op thread count
+- optional dynamic int8 quantization of the Linear layers
+- embeddings cached per text hash (a `ScoreCache`, persisted on request)
+"""
+
+import os
+
+import numpy as np
+
+from data_preprocessing import get_tokenizer
+from score_cache import ScoreCache
+
+DEFAULT_EMBEDDING_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "cache", "bert_embeddings.pkl")
+
+
+class BertEncoder:
+    """
+    Parameters:
+        model_name (str): Hugging Face model id.
+        batch_size (int): Texts per forward pass.
+        max_length (int): Token cap per text.
+        num_threads (int): torch intra-op threads (None = torch default).
+        quantize (bool): Apply dynamic int8 quantization to Linear layers.
+        cache_size (int): Embeddings kept in the in-memory LRU cache (0 = off).
+    """
+
+    def __init__(self, model_name='bert-base-uncased', batch_size=32, max_length=128,
+                 num_threads=None, quantize=False, cache_size=50_000,
+                 cache_path=DEFAULT_EMBEDDING_CACHE_PATH):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.quantize = quantize
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self._model = None
+        self._cache = None
+
+    # the torch model and cache are rebuilt on demand, never pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_model"] = None
+        state["_cache"] = None
+        return state
+
+    @property
+    def version(self):
+        return f"{self.model_name}|{self.max_length}|{'int8' if self.quantize else 'fp32'}|mean"
+
+    @property
+    def cache(self):
+        if self._cache is None and self.cache_size:
+            self._cache = ScoreCache(self.version, maxsize=self.cache_size, path=self.cache_path)
+        return self._cache
+
+    def _load(self):
+        if self._model is None:
+            import torch
+            from transformers import AutoModel
+
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            model = AutoModel.from_pretrained(self.model_name).eval()
+            if self.quantize:
+                model = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._model = model
+        return self._model
+
+    def _embed(self, texts):
+        """Embeddings for `texts` (no cache), shape (n, hidden)."""
+        import torch
+
+        model = self._load()
+        tokenizer = get_tokenizer(self.model_name)
+        ids = tokenizer(texts, truncation=True, max_length=self.max_length,
+                        padding=False)["input_ids"]
+        order = np.argsort([len(x) for x in ids], kind="stable")
+        out = np.empty((len(texts), model.config.hidden_size), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch_idx = order[start:start + self.batch_size]
+                batch = tokenizer.pad({"input_ids": [ids[i] for i in batch_idx]},
+                                      return_tensors="pt")
+                hidden = model(**batch).last_hidden_state
+                # mean over real tokens only
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1)
+                out[batch_idx] = pooled.numpy()
+        return out
+
+    def encode(self, texts):
+        """
+        Embed texts, reusing cached embeddings for texts seen before.
+
+        Returns:
+            numpy.ndarray: float32 array of shape (n_texts, hidden_size).
+        """
+        texts = [str(t) for t in texts]
+        cache = self.cache
+        cached = [cache.get(t) for t in texts] if cache is not None else [None] * len(texts)
+        missing = sorted({t for t, c in zip(texts, cached) if c is None})
+        fresh = {}
+        if missing:
+            for text, emb in zip(missing, self._embed(missing)):
+                fresh[text] = emb
+                if cache is not None:
+                    cache.put(text, emb)
+        rows = [c if c is not None else fresh[t] for t, c in zip(texts, cached)]
+        if not rows:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(rows)
+
+    def save_cache(self):
+        if self.cache is not None:
+            self.cache.save()
+
+    def load_cache(self):
+        return self.cache.load() if self.cache is not None else 0
@@ -1,21 +1,58 @@
 # src/models/image_model.py
 import numpy as np
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.utils import gen_batches
+
+from data_preprocessing import iter_image_batches
+
+IMAGE_PCA_MODES = ("full", "incremental")
+
 
 class ImageModel:
-    def __init__(self, n_components=50):
-        # we'll flatten and reduce via PCA
-        self.pca = PCA(n_components=n_components)
+    """
+    Flattens images and reduces them with PCA.
+
+    mode="full" fits an exact PCA on the whole (n, H*W*C) matrix.
+    mode="incremental" fits an IncrementalPCA one mini-batch at a time,
+    so uint8 or memory-mapped images are only converted to float32 a
+    batch at a time and peak memory is bounded by `batch_size`.
+    """
+
+    def __init__(self, n_components=50, mode="full", batch_size=256):
+        if mode not in IMAGE_PCA_MODES:
+            raise ValueError(f"mode must be one of {IMAGE_PCA_MODES}, got {mode!r}")
+        self.mode = mode
+        self.batch_size = batch_size
+        if mode == "incremental":
+            self.pca = IncrementalPCA(n_components=n_components)
+        else:
+            # we'll flatten and reduce via PCA
+            self.pca = PCA(n_components=n_components)
 
     def fit(self, images, labels=None):
-        # images: array of shape (n, H, W, C)
-        flat = images.reshape(len(images), -1)
-        self.pca.fit(flat)
+        # images: array of shape (n, H, W, C), uint8 or float in [0,1]
+        if len(images) == 0:
+            raise ValueError("ImageModel.fit needs at least one image")
+        if self.mode == "full":
+            self.pca.fit(next(iter_image_batches(images, batch_size=len(images))))
+            return self
+        # every partial_fit batch needs at least n_components rows, so a short
+        # tail is merged into the slice before it (which may then exceed batch_size)
+        n_components = self.pca.n_components
+        batch_size = max(self.batch_size, n_components)
+        for batch in gen_batches(len(images), batch_size, min_batch_size=n_components):
+            rows = images[batch]
+            for X in iter_image_batches(rows, len(rows)):
+                self.pca.partial_fit(X)
+        return self
 
     def encode(self, images):
-        flat = images.reshape(len(images), -1)
-        return self.pca.transform(flat)
+        # transform batch-wise; only the (n, n_components) output is kept whole
+        out = [self.pca.transform(batch) for batch in iter_image_batches(images, self.batch_size)]
+        if not out:
+            return np.empty((0, self.pca.n_components_), dtype=np.float32)
+        return np.vstack(out)
 
     def predict(self, images):
         # we don’t actually predict in isolation
-        raise NotImplementedError("Image-only prediction not implemented")
\ No newline at end of file
+        raise NotImplementedError("Image-only prediction not implemented")
@@ -1,24 +1,96 @@
 # src/models/multimodal_fusion.py
 import numpy as np
+from scipy import sparse
 from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MaxAbsScaler, StandardScaler
+
+MODALITIES = ("text", "audio", "image")
+FUSION_MODES = ("early", "late")
+
+
+def _as_2d(feats):
+    # flatten image feats if needed
+    if feats.ndim > 2:
+        feats = feats.reshape(len(feats), -1)
+    return feats
+
 
 class MultimodalFusion:
-    def __init__(self):
+    """
+    Combines text (sparse TF-IDF), audio and image features.
+
+    fusion="early": each modality is scaled on its own (MaxAbsScaler keeps
+        TF-IDF sparse, StandardScaler for the small dense blocks), weighted,
+        and joined with scipy.sparse.hstack into one CSR matrix for a single
+        LogisticRegression. The text matrix is never densified.
+    fusion="late": one LogisticRegression per modality; predictions use
+        the weighted mean of their predict_proba. Each modality can be
+        (re)trained on its own with `fit_modality`.
+
+    weights: optional {"text": w, "audio": w, "image": w} (default 1.0 each).
+    """
+
+    def __init__(self, fusion="early", weights=None):
+        if fusion not in FUSION_MODES:
+            raise ValueError(f"fusion must be one of {FUSION_MODES}, got {fusion!r}")
+        self.fusion = fusion
+        self.weights = {m: 1.0 for m in MODALITIES}
+        self.weights.update(weights or {})
+        self.scalers = {"text": MaxAbsScaler(), "audio": StandardScaler(),
+                        "image": StandardScaler()}
         self.clf = LogisticRegression(max_iter=1000)
+        self.modality_clfs = {}
+
+    # ── early fusion ─────────────────────────────────────────────────────────
+    def _scaled(self, name, feats, fit=False):
+        feats = _as_2d(feats)
+        scaler = self.scalers[name]
+        feats = scaler.fit_transform(feats) if fit else scaler.transform(feats)
+        weight = self.weights[name]
+        return feats * weight if weight != 1.0 else feats
+
+    def _stack(self, txt_feats, aud_feats, img_feats, fit=False):
+        blocks = [self._scaled(name, feats, fit) for name, feats in
+                  zip(MODALITIES, (txt_feats, aud_feats, img_feats))]
+        return sparse.hstack([sparse.csr_matrix(b) for b in blocks], format="csr")
 
+    # ── late fusion ──────────────────────────────────────────────────────────
+    def fit_modality(self, name, feats, labels):
+        """Fit (or refit) the late-fusion classifier of one modality."""
+        feats = self.scalers[name].fit_transform(_as_2d(feats))
+        self.modality_clfs[name] = LogisticRegression(max_iter=1000).fit(feats, labels)
+        return self
+
+    def _late_proba(self, txt_feats, aud_feats, img_feats):
+        total, weight_sum, classes = None, 0.0, None
+        for name, feats in zip(MODALITIES, (txt_feats, aud_feats, img_feats)):
+            clf = self.modality_clfs[name]
+            if classes is None:
+                classes = clf.classes_
+            elif not np.array_equal(classes, clf.classes_):
+                raise ValueError(f"{name} classifier was trained on different classes")
+            proba = clf.predict_proba(self.scalers[name].transform(_as_2d(feats)))
+            weight = self.weights[name]
+            total = proba * weight if total is None else total + proba * weight
+            weight_sum += weight
+        return classes, total / weight_sum
+
+    # ── public API ───────────────────────────────────────────────────────────
     def fit(self, txt_feats, aud_feats, img_feats, labels):
-        # flatten image feats if needed
-        if img_feats.ndim > 2:
-            img_feats = img_feats.reshape(len(img_feats), -1)
-        X = np.hstack([txt_feats.toarray() if hasattr(txt_feats, "toarray") else txt_feats,
-                       aud_feats,
-                       img_feats])
-        self.clf.fit(X, labels)
+        if self.fusion == "late":
+            for name, feats in zip(MODALITIES, (txt_feats, aud_feats, img_feats)):
+                self.fit_modality(name, feats, labels)
+        else:
+            self.clf.fit(self._stack(txt_feats, aud_feats, img_feats, fit=True), labels)
+        return self
+
+    def predict_proba(self, txt_feats, aud_feats, img_feats):
+        if self.fusion == "late":
+            return self._late_proba(txt_feats, aud_feats, img_feats)[1]
+        return self.clf.predict_proba(self._stack(txt_feats, aud_feats, img_feats))
 
     def predict(self, txt_feats, aud_feats, img_feats):
-        if img_feats.ndim > 2:
-            img_feats = img_feats.reshape(len(img_feats), -1)
-        X = np.hstack([txt_feats.toarray() if hasattr(txt_feats, "toarray") else txt_feats,
-                       aud_feats,
-                       img_feats])
-        return self.clf.predict(X)
\ No newline at end of file
+        if self.fusion == "late":
+            classes, proba = self._late_proba(txt_feats, aud_feats, img_feats)
+            return classes[np.argmax(proba, axis=1)]
+        return self.clf.predict(self._stack(txt_feats, aud_feats, img_feats))
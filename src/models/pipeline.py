@@ -0,0 +1,122 @@
+# src/models/pipeline.py
+import os
+import tempfile
+
+import numpy as np
+
+from data_preprocessing import preprocess_audio, preprocess_image
+from models.text_model import TextModel
+from models.image_model import ImageModel
+from models.multimodal_fusion import MultimodalFusion
+from models.artifacts import save_artifacts, load_artifacts
+
+def _drop_rows(array, keep):
+    # compact the kept rows to the front in place; unlike boolean indexing
+    # this never copies the whole array (which may be memory-mapped)
+    kept = np.flatnonzero(keep)
+    for new, old in enumerate(kept):
+        if new != old:
+            array[new] = array[old]
+    return array[:len(kept)]
+
+
+class MultimodalPipeline:
+    """
+    Fit-once / transform-many bundle of the TF-IDF text encoder, the image
+    PCA and the fusion classifier, saved and loaded as one model directory.
+    """
+
+    def __init__(self, n_image_components=50, feature_store=None, workers=1, progress=None,
+                 image_mode="full", image_batch_size=256, fusion="early", fusion_weights=None,
+                 text_encoder="tfidf", text_options=None, image_scratch_dir=None):
+        self.text_model = TextModel(encoder=text_encoder, **(text_options or {}))
+        self.image_model = ImageModel(n_components=n_image_components, mode=image_mode,
+                                      batch_size=image_batch_size)
+        self.fusion = MultimodalFusion(fusion=fusion, weights=fusion_weights)
+        self.feature_store = feature_store
+        self.workers = workers
+        self.progress = progress
+        self.image_scratch_dir = image_scratch_dir
+
+    def _load_images(self, image_paths, **opts):
+        # incremental PCA: build the image array in a memory-mapped scratch
+        # file, so neither decoding nor fitting holds the whole set in RAM
+        if self.image_model.mode != "incremental":
+            return preprocess_image(image_paths, dtype="uint8", **opts)
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=self.image_scratch_dir)
+        os.close(fd)
+        result = preprocess_image(image_paths, dtype="uint8", out=path,
+                                  chunk_size=self.image_model.batch_size, **opts)
+        try:
+            os.unlink(path)  # the mapping stays valid (POSIX); the space is freed with it
+        except OSError:
+            pass
+        return result
+
+    def extract(self, texts, audio_paths, image_paths):
+        """
+        raw inputs -> (texts, MFCC means, image arrays, kept row indices);
+        no fitted state. Rows whose audio or image cannot be read are
+        dropped from all three modalities so they stay aligned.
+        """
+        texts = list(texts)
+        opts = dict(store=self.feature_store, workers=self.workers,
+                    on_error="skip", progress=self.progress, return_failed=True)
+        aud_feats, aud_failed = preprocess_audio(audio_paths, **opts)
+        # images stay uint8 until ImageModel normalizes them batch by batch
+        images, img_failed = self._load_images(image_paths, **opts)
+        aud_failed = {i for i, _, _ in aud_failed}
+        img_failed = {i for i, _, _ in img_failed}
+        failed = aud_failed | img_failed
+        if not failed:
+            return texts, aud_feats, images, list(range(len(texts)))
+
+        keep = [i for i in range(len(texts)) if i not in failed]
+        # each modality only holds its own successful rows; drop the rows
+        # that failed in the *other* modality
+        aud_feats = aud_feats[[i not in failed for i in range(len(texts)) if i not in aud_failed]]
+        images = _drop_rows(images, [i not in failed for i in range(len(texts)) if i not in img_failed])
+        return [texts[i] for i in keep], aud_feats, images, keep
+
+    def fit(self, texts, audio_paths, image_paths, labels):
+        texts, aud_feats, images, keep = self.extract(texts, audio_paths, image_paths)
+        labels = [labels[i] for i in keep] if len(keep) != len(labels) else labels
+        self.text_model.fit(texts)
+        self.image_model.fit(images)
+        self.fusion.fit(self.text_model.encode(texts), aud_feats,
+                        self.image_model.encode(images), labels)
+        return self
+
+    def transform(self, texts, audio_paths, image_paths):
+        """Encoded (text, audio, image) features plus the kept row indices."""
+        texts, aud_feats, images, keep = self.extract(texts, audio_paths, image_paths)
+        return self.text_model.encode(texts), aud_feats, self.image_model.encode(images), keep
+
+    def predict(self, texts, audio_paths, image_paths):
+        """Predicted labels in input order; None for rows that could not be read."""
+        *features, keep = self.transform(texts, audio_paths, image_paths)
+        preds = np.full(len(audio_paths), None, dtype=object)
+        if keep:
+            preds[keep] = self.fusion.predict(*features)
+        return preds
+
+    def save(self, model_dir, metadata=None):
+        return save_artifacts(model_dir, {
+            "text_model": self.text_model,
+            "image_model": self.image_model,
+            "fusion": self.fusion,
+        }, metadata)
+
+    @classmethod
+    def load(cls, model_dir, feature_store=None, workers=1, progress=None):
+        components, manifest = load_artifacts(model_dir)
+        pipeline = cls.__new__(cls)
+        pipeline.feature_store = feature_store
+        pipeline.workers = workers
+        pipeline.progress = progress
+        pipeline.image_scratch_dir = None
+        pipeline.text_model = components["text_model"]
+        pipeline.image_model = components["image_model"]
+        pipeline.fusion = components["fusion"]
+        pipeline.manifest = manifest
+        return pipeline
@@ -2,19 +2,43 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 
+TEXT_ENCODERS = ("tfidf", "bert")
+
+
 class TextModel:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(max_features=5000)
+    """
+    encoder="tfidf": sparse TF-IDF features fitted on the training texts.
+    encoder="bert": dense mean-pooled embeddings from a pretrained
+        transformer (`BertEncoder`); nothing to fit. `bert_options` are
+        passed to BertEncoder (batch_size, num_threads, quantize, ...).
+    """
+
+    def __init__(self, encoder="tfidf", **bert_options):
+        if encoder not in TEXT_ENCODERS:
+            raise ValueError(f"encoder must be one of {TEXT_ENCODERS}, got {encoder!r}")
+        self.encoder = encoder
+        if encoder == "bert":
+            from models.bert_encoder import BertEncoder
+            self.bert = BertEncoder(**bert_options)
+        else:
+            self.vectorizer = TfidfVectorizer(max_features=5000)
         self.clf = LogisticRegression(max_iter=1000)
 
-    def fit(self, texts, labels):
-        X = self.vectorizer.fit_transform(texts)
-        self.clf.fit(X, labels)
+    def fit(self, texts, labels=None):
+        # without labels only the TF-IDF encoder is fitted (fusion use)
+        if self.encoder == "bert":
+            X = self.encode(texts) if labels is not None else None
+        else:
+            X = self.vectorizer.fit_transform(texts)
+        if labels is not None:
+            self.clf.fit(X, labels)
 
     def encode(self, texts):
-        # returns TF-IDF features
+        # TF-IDF features (sparse) or BERT embeddings (dense)
+        if self.encoder == "bert":
+            return self.bert.encode(texts)
         return self.vectorizer.transform(texts)
 
     def predict(self, texts):
         X = self.encode(texts)
-        return self.clf.predict(X)
\ No newline at end of file
+        return self.clf.predict(X)
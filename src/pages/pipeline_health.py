@@ -0,0 +1,57 @@
+import os
+import glob
+import json
+
+import pandas as pd
+import streamlit as st
+
+from instrumentation import METRICS_DIR
+
+st.set_page_config(page_title="🩺 Pipeline Health", layout="wide")
+st.title("🩺 Pipeline Health")
+
+# Reports written by `python src/main.py --metrics-out <mode> ...`
+reports = sorted(glob.glob(os.path.join(METRICS_DIR, "*.json")), key=os.path.getmtime, reverse=True)
+if not reports:
+    st.info("No metrics reports yet. Run e.g. `python src/main.py --metrics-out live news \"Edo 2024\"`.")
+    st.stop()
+
+choice = st.selectbox("Run", reports, format_func=os.path.basename)
+
+@st.cache_data
+def load_report(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+report = load_report(choice, os.path.getmtime(choice))
+run = report["run"]
+cols = st.columns(3)
+cols[0].metric("Mode", run.get("mode", "?"))
+cols[1].metric("Started", run["started"])
+cols[2].metric("Wall time", f"{run['wall_s']:.2f}s")
+
+# Per-stage timings
+st.header("⏱️ Stages")
+stages = pd.DataFrame.from_dict(report["stages"], orient="index")
+if stages.empty:
+    st.write("No stage timings recorded.")
+else:
+    stages["share_of_wall"] = stages["total_s"] / max(run["wall_s"], 1e-9)
+    st.dataframe(stages.sort_values("total_s", ascending=False)
+                 .style.format({"share_of_wall": "{:.1%}"}))
+    left, right = st.columns(2)
+    left.subheader("Total time per stage (s)")
+    left.bar_chart(stages["total_s"])
+    right.subheader("Latency per call (ms)")
+    right.bar_chart(stages[["p50_ms", "p95_ms"]])
+
+# Counters, observed values (e.g. DB flush sizes) and gauges (e.g. score cache)
+st.header("🔢 Counters")
+if report["counters"]:
+    st.dataframe(pd.Series(report["counters"], name="value"))
+if report["observations"]:
+    st.subheader("Observed values")
+    st.dataframe(pd.DataFrame.from_dict(report["observations"], orient="index"))
+for name, value in report["gauges"].items():
+    st.subheader(name)
+    st.json(value)
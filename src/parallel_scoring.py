@@ -0,0 +1,134 @@
+"""
+parallel_scoring.py
+
+Process-pool scoring for large corpora. Each worker process imports
+`sentiment_analysis` once (VADER + Pidgin lexicon), then scores chunks of
+texts with `analyze_and_classify_batch`. Results come back in input order.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# set in each worker by _init_worker
+_score_batch = None
+
+
+def _init_worker():
+    """Load VADER and the Pidgin lexicon once per worker process."""
+    global _score_batch
+    from sentiment_analysis import analyze_and_classify_batch
+    _score_batch = analyze_and_classify_batch
+
+
+def _score_chunk(texts, with_cleaned=False):
+    result = _score_batch(texts, with_cleaned=with_cleaned)
+    scores, labels = result[['neg', 'neu', 'pos', 'compound']].to_numpy(), result['label'].to_numpy()
+    return (scores, labels, result['cleaned'].tolist()) if with_cleaned else (scores, labels)
+
+
+def _chunked(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_score_chunks(chunks, workers=None, max_in_flight=None, with_cleaned=False):
+    """
+    Score an iterable of text chunks across a process pool.
+
+    At most `max_in_flight` chunks (default: 2 × workers) are queued at once,
+    so the input can be a lazy generator over a large table.
+
+    Parameters:
+        chunks (iterable): Lists of raw texts.
+        workers (int): Number of worker processes (default: CPU count).
+        max_in_flight (int): Upper bound on submitted-but-unread chunks.
+        with_cleaned (bool): Also send back the cleaned texts (for the
+            token-frequency index).
+
+    Yields:
+        tuple: (scores ndarray [n × 4: neg, neu, pos, compound], labels ndarray),
+        plus a list of cleaned texts with `with_cleaned`, for each input
+        chunk, in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk, with_cleaned))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_parallel(texts, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parallel equivalent of `analyze_and_classify_batch`.
+
+    Parameters:
+        texts (list or pandas.Series): The original, uncleaned texts.
+        workers (int): Number of worker processes (default: CPU count).
+        chunk_size (int): Texts sent to a worker per task.
+
+    Returns:
+        pandas.DataFrame: columns neg, neu, pos, compound, label in input order.
+    """
+    index = texts.index if isinstance(texts, pd.Series) else None
+    scores, labels = [], []
+    for chunk_scores, chunk_labels in iter_score_chunks(_chunked(list(texts), chunk_size), workers):
+        scores.append(chunk_scores)
+        labels.append(chunk_labels)
+    if not scores:
+        return pd.DataFrame(columns=['neg', 'neu', 'pos', 'compound', 'label'], index=index)
+    result = pd.DataFrame(np.vstack(scores), columns=['neg', 'neu', 'pos', 'compound'], index=index)
+    result['label'] = np.concatenate(labels)
+    return result
+
+
+def rescore_database(workers=None, chunk_size=DEFAULT_CHUNK_SIZE, db_path=None):
+    """
+    Re-score every row of `sentiment_data` in parallel and write the new
+    labels/scores back, one transaction per chunk. The token counts of
+    rows whose label changed move to the new label in the same
+    transaction; other rows leave the token-frequency index untouched.
+
+    Returns:
+        int: Number of rows re-scored.
+    """
+    from database import initialize_db, iter_stored_rows, update_sentiment_scores
+
+    initialize_db(db_path)  # token_frequencies etc. must exist before the first update
+    row_chunks = deque()
+
+    def contents():
+        for rows in iter_stored_rows(chunk_size, db_path):
+            row_chunks.append(rows)
+            yield [content for _, _, _, content, _ in rows]
+
+    total = relabelled = 0
+    for chunk_scores, chunk_labels, cleaned in iter_score_chunks(contents(), workers, with_cleaned=True):
+        rows = row_chunks.popleft()
+        labels = chunk_labels.tolist()
+        moved = [(day, source, old_label, label, clean.split())
+                 for (_, day, source, _, old_label), label, clean in zip(rows, labels, cleaned)
+                 if label != old_label]
+        update_sentiment_scores(
+            zip(labels, chunk_scores[:, 3].tolist(), [row[0] for row in rows]), db_path, moved
+        )
+        total += len(rows)
+        relabelled += len(moved)
+        print(f"Re-scored {total} rows ({relabelled} relabelled)")
+    return total
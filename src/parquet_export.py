@@ -0,0 +1,222 @@
+"""
+parquet_export.py
+
+Columnar copy of `sentiment_data` for historical analytics: a Parquet
+dataset partitioned by day and source (hive layout, zstd-compressed),
+
+    data/parquet/sentiment_data/
+        date=2024-09-21/source=twitter/part-000000120001.parquet
+        ...
+        _export_state.json     high-water mark: last exported row id
+
+`export_parquet()` appends only rows above the high-water mark, one file
+per touched partition per chunk of ids. File names derive from the
+chunk's first id, so a rerun after a crash overwrites the same files
+instead of duplicating them. Rows changed in place afterwards (e.g. by
+`main.py rescore`) are only picked up by a full re-export (`full=True`).
+
+`read_sentiment()` reads just the requested columns through
+pyarrow.dataset, pruning partitions by date/source, and adds rows stored
+in SQLite since the last export, so callers always see current data;
+`aggregate_sentiment()` builds the dashboard's filtered aggregates from
+one such scan. pyarrow is only needed when the export is written or read.
+"""
+
+import os
+import json
+import shutil
+import datetime
+
+import pandas as pd
+
+from database import get_connection, initialize_db
+
+PARQUET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "parquet", "sentiment_data")
+STATE_FILE = "_export_state.json"  # pyarrow.dataset skips files starting with "_"
+DEFAULT_CHUNK_SIZE = 250_000
+COLUMNS = ["id", "source", "content", "sentiment_label", "sentiment_score",
+           "date_collected", "content_hash"]
+PARTITION_COLUMNS = ["date", "source"]
+
+
+def _file_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()),
+        ("content", pa.string()),
+        ("sentiment_label", pa.string()),
+        ("sentiment_score", pa.float64()),
+        ("date_collected", pa.timestamp("s")),
+        ("content_hash", pa.string()),
+    ])
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([("date", pa.string()), ("source", pa.string())]), flavor="hive")
+
+
+def load_state(out_dir=PARQUET_DIR):
+    """The export's high-water mark ({"max_id", "rows", "updated"}), or None."""
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_state(out_dir, state):
+    tmp = os.path.join(out_dir, STATE_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, STATE_FILE))
+
+
+def _write_chunk(df, out_dir, compression):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _file_schema()
+    name = f"part-{int(df['id'].iloc[0]):012d}.parquet"
+    df = df.assign(date=df["date_collected"].str[:10],
+                   date_collected=pd.to_datetime(df["date_collected"], format="ISO8601"))
+    files = 0
+    for (day, source), part in df.groupby(PARTITION_COLUMNS, sort=False):
+        part_dir = os.path.join(out_dir, f"date={day}", f"source={source}")
+        os.makedirs(part_dir, exist_ok=True)
+        table = pa.Table.from_pandas(part[schema.names], schema=schema, preserve_index=False)
+        pq.write_table(table, os.path.join(part_dir, name), compression=compression)
+        files += 1
+    return files
+
+
+def export_parquet(out_dir=PARQUET_DIR, full=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                   compression="zstd", db_path=None, progress=print):
+    """
+    Append rows stored since the last export to the Parquet dataset.
+
+    Parameters:
+        out_dir (str): Dataset directory.
+        full (bool): Rebuild the whole dataset (into a temporary directory
+            that replaces `out_dir` when complete).
+        chunk_size (int): Rows read from SQLite per step.
+        compression (str): Parquet codec ('zstd', 'snappy', 'gzip', ...).
+        db_path (str): Database file (default: database.DB_PATH).
+        progress (callable): Called with a status line after each chunk.
+
+    Returns:
+        dict: The new export state (max_id, rows, updated).
+    """
+    initialize_db(db_path)
+    conn = get_connection(db_path)
+    target, out_dir = out_dir, (f"{out_dir}.tmp{os.getpid()}" if full else out_dir)
+    if full:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir, exist_ok=True)
+    state = (None if full else load_state(out_dir)) or {"max_id": 0, "rows": 0}
+
+    sql = (f"SELECT {', '.join(COLUMNS)} FROM sentiment_data "
+           f"WHERE id > ? ORDER BY id LIMIT ?")
+    while True:
+        df = pd.read_sql_query(sql, conn, params=(state["max_id"], chunk_size))
+        if df.empty:
+            break
+        files = _write_chunk(df, out_dir, compression)
+        state = {"max_id": int(df["id"].iloc[-1]), "rows": state["rows"] + len(df),
+                 "updated": datetime.datetime.now().isoformat(timespec="seconds")}
+        _save_state(out_dir, state)
+        if progress:
+            progress(f"Exported {state['rows']:,} rows (up to id {state['max_id']:,}, {files} files)")
+
+    if full:
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        os.rename(out_dir, target)
+    return state
+
+
+def _partition_filter(start=None, end=None, sources=None):
+    import pyarrow.dataset as ds
+
+    expr, clauses = None, []
+    if start is not None:
+        clauses.append(ds.field("date") >= start.isoformat())
+    if end is not None:
+        clauses.append(ds.field("date") <= end.isoformat())
+    if sources:
+        clauses.append(ds.field("source").isin(list(sources)))
+    for clause in clauses:
+        expr = clause if expr is None else expr & clause
+    return expr
+
+
+def read_sentiment(columns, start=None, end=None, sources=None, out_dir=PARQUET_DIR, db_path=None):
+    """
+    Only `columns` of the filtered rows, from the Parquet export plus any
+    rows stored in SQLite since (same filters as `queries.fetch_columns`).
+
+    Parameters:
+        columns (list): Any of COLUMNS (source and date_collected included).
+        start, end (datetime.date or None): Inclusive day range; prunes
+            `date=` partitions.
+        sources (list or None): Prunes `source=` partitions.
+
+    Returns:
+        pandas.DataFrame, or None when there is no export (or no pyarrow).
+    """
+    from queries import fetch_columns
+
+    state = load_state(out_dir)
+    if state is None:
+        return None
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        return None
+
+    dataset = ds.dataset(out_dir, format="parquet", partitioning=_partitioning())
+    table = dataset.to_table(columns=list(columns), filter=_partition_filter(start, end, sources))
+    df = table.to_pandas()
+
+    conn = get_connection(db_path)
+    tail = fetch_columns(conn, columns, start, end, sources, after_id=state["max_id"])
+    if tail.empty:
+        return df
+    return pd.concat([df, tail], ignore_index=True)
+
+
+def aggregate_sentiment(start=None, end=None, sources=None, bins=40, counts=True,
+                        out_dir=PARQUET_DIR, db_path=None):
+    """
+    The dashboard's aggregates from a single `read_sentiment` scan, in the
+    shapes returned by the matching `queries` functions.
+
+    Parameters:
+        start, end, sources: As for `read_sentiment`.
+        bins (int): Score histogram bins over [-1, 1].
+        counts (bool): Also compute label/daily/source counts (reads the
+            date_collected and source columns too).
+
+    Returns:
+        dict: "histogram" (as queries.score_histogram) and, with `counts`,
+        "labels", "daily", "sources" (as queries.label_counts,
+        daily_counts, source_counts); None when there is no export.
+    """
+    columns = ["sentiment_label", "sentiment_score"]
+    if counts:
+        columns += ["date_collected", "source"]
+    df = read_sentiment(columns, start, end, sources, out_dir, db_path)
+    if df is None:
+        return None
+
+    score_bin = ((df["sentiment_score"] + 1) * (bins / 2)).astype(int).clip(upper=bins - 1)
+    result = {"histogram": (df.assign(bin=score_bin).groupby(["sentiment_label", "bin"]).size()
+                            .rename("n").reset_index())}
+    if counts:
+        day = pd.to_datetime(df["date_collected"]).dt.normalize().rename("day")
+        result["daily"] = df.groupby([day, "sentiment_label"]).size().rename("n").reset_index()
+        result["sources"] = df.groupby(["source", "sentiment_label"]).size().rename("n").reset_index()
+        result["labels"] = (df.groupby("sentiment_label").size().rename("n")
+                            .sort_values(ascending=False))
+    return result
@@ -0,0 +1,181 @@
+"""
+queries.py
+
+Read-side SQL for the dashboard. Aggregates come from the rollup tables
+whenever the active filters allow it, and otherwise fall back to an
+indexed GROUP BY on `sentiment_data`; row listings are paginated in SQL.
+
+Filters shared by every function:
+    start, end (datetime.date or None): inclusive date range on date_collected
+    sources (list or None): restrict to these sources
+"""
+
+import datetime
+
+import pandas as pd
+
+
+def _where(start=None, end=None, sources=None, after_id=None, before_id=None):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("date_collected >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("date_collected < ?")
+        params.append((end + datetime.timedelta(days=1)).isoformat())
+    if sources:
+        clauses.append(f"source IN ({','.join('?' * len(sources))})")
+        params.extend(sources)
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _day_where(start=None, end=None):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("day >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("day <= ?")
+        params.append(end.isoformat())
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _source_where(sources=None):
+    if not sources:
+        return "", []
+    return f" WHERE source IN ({','.join('?' * len(sources))})", list(sources)
+
+
+def latest_id(conn):
+    """Highest row id (0 for an empty table)."""
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM sentiment_data").fetchone()[0]
+
+
+def data_version(conn):
+    """Counter bumped by every insert, update or delete; used as a cache key."""
+    row = conn.execute("SELECT version FROM sentiment_data_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def list_sources(conn):
+    return [r[0] for r in conn.execute(
+        "SELECT DISTINCT source FROM source_sentiment_rollup ORDER BY source")]
+
+
+def date_bounds(conn):
+    """(first_day, last_day) present in the data, or (None, None)."""
+    lo, hi = conn.execute("SELECT MIN(day), MAX(day) FROM daily_sentiment_rollup").fetchone()
+    if lo is None:
+        return None, None
+    return datetime.date.fromisoformat(lo), datetime.date.fromisoformat(hi)
+
+
+def daily_counts(conn, start=None, end=None, sources=None):
+    """Rows per (day, sentiment_label), as a DataFrame."""
+    if not sources:
+        where, params = _day_where(start, end)
+        sql = f"SELECT day, sentiment_label, n FROM daily_sentiment_rollup{where}"
+    else:
+        where, params = _where(start, end, sources)
+        sql = (f"SELECT date(date_collected) AS day, sentiment_label, COUNT(*) AS n "
+               f"FROM sentiment_data{where} GROUP BY 1, 2")
+    return pd.read_sql_query(sql, conn, params=params, parse_dates=["day"])
+
+
+def source_counts(conn, start=None, end=None, sources=None):
+    """Rows per (source, sentiment_label), as a DataFrame."""
+    if start is None and end is None:
+        where, params = _source_where(sources)
+        sql = f"SELECT source, sentiment_label, n FROM source_sentiment_rollup{where}"
+    else:
+        where, params = _where(start, end, sources)
+        sql = (f"SELECT source, sentiment_label, COUNT(*) AS n "
+               f"FROM sentiment_data{where} GROUP BY 1, 2")
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def label_counts(conn, start=None, end=None, sources=None):
+    """Rows per sentiment_label, as a Series (largest first)."""
+    if sources:
+        counts = source_counts(conn, start, end, sources)
+    else:
+        counts = daily_counts(conn, start, end)
+    return counts.groupby('sentiment_label')['n'].sum().sort_values(ascending=False)
+
+
+def fetch_rows(conn, start=None, end=None, sources=None, limit=50, before_id=None):
+    """
+    One page of rows, newest first: the first page, or the rows after a
+    page whose lowest id was `before_id` (keyset pagination on the primary
+    key, so deep pages cost the same as the first).
+    """
+    where, params = _where(start, end, sources, before_id=before_id)
+    sql = f"SELECT * FROM sentiment_data{where} ORDER BY id DESC LIMIT ?"
+    return pd.read_sql_query(sql, conn, params=params + [limit],
+                             parse_dates=["date_collected"])
+
+
+def fetch_new_rows(conn, after_id, start=None, end=None, sources=None, limit=50):
+    """Rows with id > `after_id` (newest first, at most `limit`)."""
+    where, params = _where(start, end, sources, after_id=after_id)
+    sql = f"SELECT * FROM sentiment_data{where} ORDER BY id DESC LIMIT ?"
+    return pd.read_sql_query(sql, conn, params=params + [limit],
+                             parse_dates=["date_collected"])
+
+
+def fetch_columns(conn, columns, start=None, end=None, sources=None, after_id=None):
+    """Only the requested columns of the filtered rows (with id > `after_id`, if given)."""
+    where, params = _where(start, end, sources, after_id=after_id)
+    sql = f"SELECT {', '.join(columns)} FROM sentiment_data{where}"
+    return pd.read_sql_query(sql, conn, params=params,
+                             parse_dates=[c for c in columns if c == "date_collected"])
+
+
+def score_histogram(conn, start=None, end=None, sources=None, bins=40):
+    """
+    Rows per (sentiment_label, score bin), binned inside SQLite: `bins`
+    equal-width bins over [-1, 1], bin 0 starting at -1.
+
+    Returns:
+        pandas.DataFrame: sentiment_label, bin, n.
+    """
+    where, params = _where(start, end, sources)
+    half = bins / 2
+    sql = (f"SELECT sentiment_label, MIN(CAST((sentiment_score + 1) * {half} AS INTEGER), {bins - 1}) AS bin, "
+           f"COUNT(*) AS n FROM sentiment_data{where} GROUP BY 1, 2")
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def top_tokens(conn, limit=200, start=None, end=None, sources=None, labels=None):
+    """
+    Most frequent cleaned tokens from the token-frequency index.
+
+    Returns:
+        dict: token -> count, at most `limit` entries.
+    """
+    where, params = _day_where(start, end)
+    clauses = [where[len(" WHERE "):]] if where else []
+    if sources:
+        clauses.append(f"source IN ({','.join('?' * len(sources))})")
+        params.extend(sources)
+    if labels:
+        clauses.append(f"sentiment_label IN ({','.join('?' * len(labels))})")
+        params.extend(labels)
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    sql = (f"SELECT token, SUM(n) AS n FROM token_frequencies{where} "
+           f"GROUP BY token ORDER BY n DESC LIMIT ?")
+    return dict(conn.execute(sql, params + [limit]).fetchall())
+
+
+def dedup_stats(conn):
+    """Cumulative ingestion dedup counts and duplicate rate per source."""
+    df = pd.read_sql_query(
+        "SELECT source, seen, exact_dups, near_dups FROM dedup_stats ORDER BY source", conn)
+    df['dup_rate'] = ((df['exact_dups'] + df['near_dups']) / df['seen'].where(df['seen'] > 0)).fillna(0.0)
+    return df
@@ -0,0 +1,117 @@
+"""
+score_cache.py
+
+Bounded LRU cache for VADER scores, keyed on a content hash of the raw
+text and the lexicon version, with hit/miss statistics and optional
+persistence to disk.
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 100_000
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache", "score_cache.pkl")
+
+
+class ScoreCache:
+    """
+    LRU map from hash(version, text) to a tuple of scores.
+
+    Parameters:
+        version (str): Lexicon version; part of every key, and a persisted
+            cache written under a different version is discarded on load.
+        maxsize (int): Maximum number of entries before LRU eviction.
+        path (str): File used by `save()` / `load()`.
+    """
+
+    def __init__(self, version, maxsize=DEFAULT_MAXSIZE, path=DEFAULT_CACHE_PATH):
+        self.version = version
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefix = f"{version}\x00".encode('utf-8')
+
+    def key(self, text):
+        return hashlib.blake2b(self._prefix + text.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, text):
+        """Return the cached value for `text`, or None on a miss."""
+        k = self.key(text)
+        with self._lock:
+            value = self._data.get(k)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(k)
+            self.hits += 1
+            return value
+
+    def put(self, text, value):
+        k = self.key(text)
+        with self._lock:
+            self._data[k] = value
+            self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path=None):
+        """Atomically write the cache contents to disk."""
+        path = path or self.path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            payload = {"version": self.version, "entries": list(self._data.items())}
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def load(self, path=None):
+        """
+        Load entries saved by `save()`. Returns the number of new entries
+        that are in the cache afterwards (0 if the file is missing or from
+        another lexicon version); entries already cached, or evicted again
+        by `maxsize`, are not counted.
+        """
+        path = path or self.path
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+        if payload.get("version") != self.version:
+            return 0
+        with self._lock:
+            added = []
+            for k, value in payload["entries"][-self.maxsize:]:
+                if k not in self._data:
+                    added.append(k)
+                self._data[k] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return sum(k in self._data for k in added)
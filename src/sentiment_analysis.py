@@ -5,28 +5,77 @@ This module provides functions to analyze sentiment using VADER,
 after cleaning raw text for best results.
 """
 
-import os
-import csv
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 
 # pull in our cleaning helper
-from data_preprocessing import clean_text_for_vader
+from data_preprocessing import clean_text_for_vader, ensure_nltk_resource
+from lexicon import (PIDGIN_LEXICON_PATH, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD,
+                     load_pidgin_lexicon, scoring_version)
+from compiled_lexicon import load_or_compile, vader_rule_words
+from score_cache import ScoreCache
+from instrumentation import metrics
+
+pidgin_path = PIDGIN_LEXICON_PATH
+
+# ── Score cache, invalidated by any lexicon edit ─────────────────────────────
+LEXICON_VERSION = scoring_version(pidgin_path)
+score_cache = ScoreCache(LEXICON_VERSION)
+
+
+def _new_vader():
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    # Ensure that the VADER lexicon is available (offline check first).
+    ensure_nltk_resource('sentiment/vader_lexicon.zip', 'vader_lexicon')
+    return SentimentIntensityAnalyzer()
+
+
+def _lexicon_sources():
+    vader = _new_vader()
+    return dict(vader.lexicon), load_pidgin_lexicon(pidgin_path), vader_rule_words(vader.constants)
+
+
+# ── Compiled VADER + Pidgin lexicon (memory-mapped, built once per version) ──
+compiled_lexicon = load_or_compile(LEXICON_VERSION, _lexicon_sources)
 
-# Ensure that the VADER lexicon is downloaded.
-nltk.download('vader_lexicon', quiet=True)
 
-# Initialize VADER analyzer
-sia = SentimentIntensityAnalyzer()
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """
+    Full NLTK VADER with the Pidgin lexicon (and merged phrase tokens),
+    built on first use: only texts with negations, boosters, punctuation
+    etc. need its rule walk.
+    """
+    analyzer = _new_vader()
+    analyzer.lexicon.update(load_pidgin_lexicon(pidgin_path))
+    analyzer.lexicon.update(compiled_lexicon.phrase_entries())
+    return analyzer
+
+
+def __getattr__(name):
+    # keep `sentiment_analysis.sia` working without building it at import
+    if name == 'sia':
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def polarity_scores_batch(texts):
+    """
+    VADER scores for cleaned texts: the compiled lexicon's tight loop
+    where VADER's rules cannot apply, the full analyzer otherwise.
+    Multi-word Pidgin phrases are merged into single tokens either way.
+    """
+    results = compiled_lexicon.polarity_scores_batch(texts)
+    for i, scores in enumerate(results):
+        if scores is None:
+            results[i] = get_analyzer().polarity_scores(compiled_lexicon.merge_phrases(texts[i]))
+    return results
+
 
-# ── Load Pidgin lexicon and merge into VADER ─────────────────────────────────
-pidgin_path = os.path.join(os.path.dirname(__file__), "..//src/pidgin_lexicon.csv")  
-with open(pidgin_path, newline='', encoding='utf-8') as f:                                            
-    reader = csv.DictReader(f)                                                                         
-    for row in reader:                                                                                 
-        word = row['word']                                                                             
-        score = float(row['sentiment_score'])                                                                    
-        sia.lexicon[word] = score
+SCORE_COLUMNS = ['neg', 'neu', 'pos', 'compound']
 
 def analyze_sentiment(text):
     """
@@ -38,8 +87,7 @@ def analyze_sentiment(text):
     Returns:
         dict: A dictionary containing VADER sentiment scores.
     """
-    scores = sia.polarity_scores(text)
-    return scores
+    return polarity_scores_batch([text])[0]
 
 def classify_sentiment(compound_score):
     """
@@ -51,9 +99,9 @@ def classify_sentiment(compound_score):
     Returns:
         str: 'Positive', 'Negative', or 'Neutral' sentiment.
     """
-    if compound_score >= 0.10:
+    if compound_score >= POSITIVE_THRESHOLD:
         return "Positive"
-    elif compound_score <= -0.10:
+    elif compound_score <= NEGATIVE_THRESHOLD:
         return "Negative"
     else:
         return "Neutral"
@@ -68,12 +116,105 @@ def analyze_and_classify(raw_text):
     Returns:
         tuple: (sentiment_scores (dict), label (str))
     """
+    cached = score_cache.get(raw_text)
+    if cached is not None:
+        scores = dict(zip(SCORE_COLUMNS, cached))
+        return scores, classify_sentiment(scores['compound'])
+
     # 1) Clean for VADER
-    cleaned = clean_text_for_vader(raw_text)
+    with metrics.stage("clean"):
+        cleaned = clean_text_for_vader(raw_text)
 
     # 2) Compute VADER scores on cleaned text
-    scores = analyze_sentiment(cleaned)
+    with metrics.stage("score"):
+        scores = analyze_sentiment(cleaned)
+    score_cache.put(raw_text, tuple(scores[c] for c in SCORE_COLUMNS))
 
     # 3) Derive label
     label = classify_sentiment(scores['compound'])
-    return scores, label
\ No newline at end of file
+    return scores, label
+
+
+def classify_sentiment_array(compound_scores):
+    """
+    Vectorized `classify_sentiment` over an array of compound scores.
+
+    Parameters:
+        compound_scores (array-like): Compound sentiment scores.
+
+    Returns:
+        numpy.ndarray: Array of 'Positive', 'Negative' or 'Neutral' labels.
+    """
+    compound = np.asarray(compound_scores, dtype=float)
+    return np.select(
+        [compound >= POSITIVE_THRESHOLD, compound <= NEGATIVE_THRESHOLD],
+        ["Positive", "Negative"],
+        default="Neutral",
+    )
+
+
+def analyze_and_classify_batch(texts, with_cleaned=False):
+    """
+    Clean, score and label many texts at once.
+
+    Duplicate raw texts (and raw texts that clean to the same string) are
+    scored only once, previously seen texts come from `score_cache`, and
+    labelling is a single array operation.
+
+    Parameters:
+        texts (list or pandas.Series): The original, uncleaned texts.
+        with_cleaned (bool): Also return each cleaned text (column
+            'cleaned'), e.g. for the token-frequency index; cache hits are
+            cleaned only in this case.
+
+    Returns:
+        pandas.DataFrame: One row per input text (index preserved for a
+        Series) with columns neg, neu, pos, compound and label.
+    """
+    series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+    if series.empty:
+        columns = SCORE_COLUMNS + ['label'] + (['cleaned'] if with_cleaned else [])
+        return pd.DataFrame(columns=columns, index=series.index)
+    metrics.observe("score_batch_size", len(series))
+
+    # 1) Look up each distinct raw text in the score cache
+    raw_codes, raw_uniques = pd.factorize(series.fillna("").astype(str))
+    unique_scores = np.empty((len(raw_uniques), len(SCORE_COLUMNS)), dtype=float)
+    miss_pos, miss_texts = [], []
+    unique_cleaned = {}
+    for i, text in enumerate(raw_uniques):
+        cached = score_cache.get(text)
+        if cached is None:
+            miss_pos.append(i)
+            miss_texts.append(text)
+        else:
+            unique_scores[i] = cached
+
+    if miss_texts:
+        # 2) Clean the misses, then score each distinct cleaned text once
+        with metrics.stage("clean", items=len(miss_texts)):
+            cleaned = [clean_text_for_vader(t) for t in miss_texts]
+        if with_cleaned:
+            unique_cleaned.update(zip(miss_pos, cleaned))
+        clean_codes, clean_uniques = pd.factorize(pd.Series(cleaned, dtype=object))
+        with metrics.stage("score", items=len(clean_uniques)):
+            clean_scores = np.array(
+                [[s[c] for c in SCORE_COLUMNS] for s in polarity_scores_batch(list(clean_uniques))],
+                dtype=float,
+            ).reshape(-1, len(SCORE_COLUMNS))
+        miss_scores = clean_scores[clean_codes]
+        unique_scores[miss_pos] = miss_scores
+        for text, row in zip(miss_texts, miss_scores.tolist()):
+            score_cache.put(text, tuple(row))
+
+    scores = unique_scores[raw_codes]
+
+    # 3) Derive labels in one pass
+    result = pd.DataFrame(scores, columns=SCORE_COLUMNS, index=series.index)
+    result['label'] = classify_sentiment_array(result['compound'].to_numpy())
+    if with_cleaned:
+        hits = [i for i in range(len(raw_uniques)) if i not in unique_cleaned]
+        with metrics.stage("clean", items=len(hits)):
+            unique_cleaned.update((i, clean_text_for_vader(raw_uniques[i])) for i in hits)
+        result['cleaned'] = [unique_cleaned[code] for code in raw_codes]
+    return result
@@ -0,0 +1,240 @@
+"""
+service.py
+
+Long-running local HTTP scoring service (stdlib only). The lexicon,
+VADER and the score cache are loaded once at startup; concurrent
+requests are gathered by a micro-batcher thread into single
+`analyze_and_classify_batch` calls.
+
+    POST /score        {"text": "..."}         -> {"label", "compound", "neg", "neu", "pos"}
+    POST /score_batch  {"texts": ["...", ...]} -> {"results": [...]}
+    GET  /stats        request latency p50/p95/p99, batch sizes, cache stats
+    GET  /health       {"status": "ok"}
+
+    python src/main.py serve --port 8000
+    curl -s localhost:8000/score -d '{"text": "Peaceful vote for Oredo"}'
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from sentiment_analysis import analyze_and_classify_batch, score_cache, SCORE_COLUMNS
+from instrumentation import Metrics
+
+MAX_BATCH_TEXTS = 10_000   # per /score_batch request
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class MicroBatcher:
+    """
+    Gathers texts submitted from many threads into batch-scorer calls.
+
+    A batch is scored as soon as `max_batch` texts are waiting, or
+    `max_wait` seconds after its first request arrived, whichever comes
+    first; a single request larger than `max_batch` is scored on its own.
+    With `max_wait=0` whatever is queued is scored at once, and requests
+    arriving meanwhile form the next batch: no added latency when idle,
+    larger batches under load.
+
+    Parameters:
+        score_batch (callable): list of texts -> DataFrame with
+            SCORE_COLUMNS and label (default: analyze_and_classify_batch).
+        max_batch (int): Texts per scorer call, at most (roughly).
+        max_wait (float): Seconds a request may wait for others to join.
+        stats (instrumentation.Metrics): Where batch sizes and scoring
+            times are recorded (default: a new, enabled instance).
+    """
+
+    def __init__(self, score_batch=analyze_and_classify_batch, max_batch=64, max_wait=0.0,
+                 stats=None):
+        self.score_batch = score_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        if stats is None:
+            stats = Metrics()
+            stats.enable()
+        self.stats = stats
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """Queue `texts`; the Future resolves to a list of result dicts."""
+        future = Future()
+        self._requests.put((texts, future))
+        return future
+
+    def score(self, texts, timeout=None):
+        return self.submit(texts).result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                try:
+                    item = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._score(batch, size)
+
+    def _score(self, batch, size):
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        self.stats.observe("service_batch_texts", size)
+        self.stats.observe("service_batch_requests", len(batch))
+        try:
+            with self.stats.stage("service_score", items=size):
+                scored = self.score_batch(texts)
+            results = [dict(zip(SCORE_COLUMNS + ["label"], row))
+                       for row in zip(*(scored[c].tolist() for c in SCORE_COLUMNS + ["label"]))]
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        start = 0
+        for request_texts, future in batch:
+            future.set_result(results[start:start + len(request_texts)])
+            start += len(request_texts)
+
+
+class _BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def make_handler(batcher, timeout=30.0):
+    """Request handler class bound to `batcher` (and its `stats`, served at /stats)."""
+    stats = batcher.stats
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive: clients reuse one connection
+        disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _content_length(self):
+            value = self.headers.get("Content-Length") or "0"
+            try:
+                length = int(value)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True  # the body's extent is unknown
+                raise _BadRequest(400, f"invalid Content-Length {value!r}")
+            return length
+
+        def _discard_body(self):
+            # keep-alive: an unread body would be parsed as the next request
+            length = self._content_length()
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True
+            elif length:
+                self.rfile.read(length)
+
+        def _read_json(self):
+            length = self._content_length()
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True  # the unread body would be parsed as the next request
+                raise _BadRequest(413, "request body too large")
+            try:
+                return json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                raise _BadRequest(400, "body is not valid JSON")
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                stats.gauge("score_cache", score_cache.stats())
+                report = stats.report()
+                self._send_json(200, {"requests": {k: v for k, v in report["stages"].items()
+                                                   if k.startswith("http_")},
+                                      "batches": report["observations"],
+                                      "scoring": report["stages"].get("service_score"),
+                                      "score_cache": report["gauges"].get("score_cache")})
+            else:
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            try:
+                if self.path == "/score":
+                    payload = self._read_json()
+                    text = payload.get("text") if isinstance(payload, dict) else None
+                    if not isinstance(text, str):
+                        raise _BadRequest(400, 'expected {"text": "..."}')
+                    with stats.stage("http_score"):
+                        result = batcher.score([text], timeout)[0]
+                    self._send_json(200, result)
+                elif self.path == "/score_batch":
+                    payload = self._read_json()
+                    texts = payload.get("texts") if isinstance(payload, dict) else None
+                    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                        raise _BadRequest(400, 'expected {"texts": ["...", ...]}')
+                    if len(texts) > MAX_BATCH_TEXTS:
+                        raise _BadRequest(413, f"at most {MAX_BATCH_TEXTS} texts per request")
+                    with stats.stage("http_score_batch", items=max(1, len(texts))):
+                        results = batcher.score(texts, timeout) if texts else []
+                    self._send_json(200, {"results": results})
+                else:
+                    self._discard_body()
+                    self._send_json(404, {"error": f"unknown path {self.path}"})
+            except _BadRequest as e:
+                stats.count("http_errors")
+                self._send_json(e.status, {"error": str(e)})
+            except Exception as e:
+                stats.count("http_errors")
+                self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, *args):
+            pass
+
+    return ScoringHandler
+
+
+def make_server(host="127.0.0.1", port=8000, max_batch=64, max_wait=0.0):
+    """
+    Warm up the scorer and build (but do not start) the HTTP server;
+    `server.server_port` is the bound port (useful with port=0) and
+    `server.stats` the service's own Metrics behind /stats, kept apart
+    from the process-wide `instrumentation.metrics` (--metrics-out).
+    """
+    analyze_and_classify_batch(["warm up the lexicon and lemmatizer"])
+    batcher = MicroBatcher(max_batch=max_batch, max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    server.daemon_threads = True
+    server.stats = batcher.stats
+    return server
+
+
+def serve(host="127.0.0.1", port=8000, max_batch=64, max_wait=0.0):
+    """Run the scoring service until interrupted; the score cache is kept between runs."""
+    score_cache.load()
+    server = make_server(host, port, max_batch, max_wait)
+    print(f"Scoring service on http://{host}:{server.server_port} "
+          f"(micro-batches of up to {max_batch}, {max_wait * 1000:g} ms wait)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        score_cache.save()
+        for name, stats in server.stats.report()["stages"].items():
+            if name.startswith("http_"):
+                print(f"{name}: {stats['count']} requests, p50 {stats['p50_ms']} ms, "
+                      f"p99 {stats['p99_ms']} ms", file=sys.stderr)
@@ -0,0 +1,144 @@
+"""
+streaming.py
+
+Streaming variant of the live pipeline:
+
+    collector ──(bounded queue)──> scorer ──(bounded queue)──> SQLite sink
+
+The collector yields texts one at a time, the scorer gathers them into
+micro-batches for `analyze_and_classify_batch`, and the sink writes each
+batch through a `SentimentWriter` with a short flush interval, so rows
+become visible to the dashboard while the crawl is still running. The
+bounded queues give backpressure between stages, and only running label
+counts are kept, so memory stays flat however many items are ingested.
+"""
+
+import queue
+import threading
+import time
+
+from sentiment_analysis import analyze_and_classify_batch
+from database import SentimentWriter
+
+_DONE = object()
+
+
+def iter_source_texts(source, query):
+    """
+    Yield raw texts for a live source.
+
+    Parameters:
+        source (str): 'twitter', 'web' or 'news'.
+        query (str or list): Search query (or queries), or URL(s) for the
+            web source. Web pages and news queries go through the async
+            collector, so several of either are fetched concurrently.
+    """
+    if source == "twitter":
+        from data_collection import collect_tweets
+        yield from collect_tweets(query=query)
+        return
+
+    from async_collection import stream_collected
+    keys = [query] if isinstance(query, str) else list(query)
+    items = stream_collected(urls=keys) if source == "web" else stream_collected(queries=keys)
+    for item in items:
+        if item["error"] and source == "news":
+            print(f"Error fetching news: {item['error']}")
+        yield from item["texts"]
+
+
+class _Stage(threading.Thread):
+    """Daemon thread that forwards any exception to the downstream queue."""
+
+    def __init__(self, name, target, out_queue):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self._out = out_queue
+
+    def run(self):
+        try:
+            self._target_fn()
+        except BaseException as e:
+            self._out.put(e)
+        finally:
+            self._out.put(_DONE)
+
+
+def run_streaming(source, texts, batch_size=64, max_wait=0.5, queue_size=256,
+                  writer_batch_size=500, flush_interval=1.0, db_path=None, on_batch=None,
+                  dedup=None):
+    """
+    Score and store `texts` as a stream.
+
+    Parameters:
+        source (str): Value stored in the `source` column.
+        texts (iterable): Raw texts; may be a lazy generator.
+        batch_size (int): Maximum texts per scoring micro-batch.
+        max_wait (float): Seconds to wait for a micro-batch to fill before
+            scoring a partial one.
+        queue_size (int): Capacity of each inter-stage queue (backpressure).
+        writer_batch_size (int): Rows per SQLite flush.
+        flush_interval (float): Maximum seconds between SQLite flushes.
+        db_path (str): Database file (default: database.DB_PATH).
+        on_batch (callable): Optional callback(scored DataFrame) per micro-batch.
+        dedup (dedup.Deduplicator): Drops exact and near duplicates before
+            scoring and indexes the stored rows.
+
+    Returns:
+        collections.Counter: Rows actually stored per sentiment label (exact
+        duplicates skipped by the writer are not counted).
+    """
+    raw_q = queue.Queue(maxsize=queue_size)
+    scored_q = queue.Queue(maxsize=max(1, queue_size // batch_size))
+
+    if dedup is not None:
+        texts = dedup.iter_unique(source, texts)
+
+    def collect():
+        for text in texts:
+            raw_q.put(text)
+
+    def score():
+        finished = False
+        while not finished:
+            batch = []
+            deadline = time.monotonic() + max_wait
+            while len(batch) < batch_size:
+                try:
+                    item = raw_q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                batch.append(item)
+            if batch:
+                scored_q.put(analyze_and_classify_batch(batch, with_cleaned=True).assign(content=batch))
+
+    collector = _Stage("stream-collector", collect, raw_q)
+    scorer = _Stage("stream-scorer", score, scored_q)
+    collector.start()
+    scorer.start()
+
+    with SentimentWriter(db_path, batch_size=writer_batch_size, flush_interval=flush_interval,
+                         dedup=dedup) as writer:
+        while True:
+            try:
+                scored = scored_q.get(timeout=flush_interval)
+            except queue.Empty:
+                # nothing new: commit whatever is buffered so readers see it
+                writer.flush()
+                continue
+            if scored is _DONE:
+                break
+            if isinstance(scored, BaseException):
+                raise scored
+            writer.add_many(zip([source] * len(scored), scored['content'].tolist(),
+                                scored['label'].tolist(), scored['compound'].tolist(),
+                                scored['cleaned'].tolist()))
+            if on_batch is not None:
+                on_batch(scored)
+    # after close(): rows dropped as stored duplicates are not counted
+    return writer.label_counts